@@ -1,4 +1,22 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
 from .cache import CacheStore
-from .orchestrator import cache_status, discover, listen
 
-__all__ = ["CacheStore", "discover", "listen", "cache_status"]
+if TYPE_CHECKING:
+    from .orchestrator import cache_status, discover, listen, listen_batch
+
+__all__ = ["CacheStore", "discover", "listen", "listen_batch", "cache_status"]
+
+_ORCHESTRATOR_EXPORTS = frozenset({"discover", "listen", "listen_batch", "cache_status"})
+
+
+# The orchestrator pulls in librosa/numba via analysis; resolve it on first use so tools that
+# only need the cache or discovery do not pay that import cost.
+def __getattr__(name: str) -> Any:
+    if name in _ORCHESTRATOR_EXPORTS:
+        from . import orchestrator
+
+        return getattr(orchestrator, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
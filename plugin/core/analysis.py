@@ -1,54 +1,83 @@
 from __future__ import annotations
 
-import json
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import orjson
+
+try:
+    import librosa
+    import numpy as np
+except ImportError:
+    librosa = None
+    np = None
+
+try:
+    from numba import njit
+except ImportError:  # numba ships with librosa but stays optional here
+    njit = None
+
 from .cache import CacheStore
 from .errors import AnalysisError
 from .models import FeatureResult
 
 
+PITCH_NAMES = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+MAJOR_TEMPLATE = [6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88]
+MINOR_TEMPLATE = [6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17]
+
+
+def _build_key_templates():
+    # Rows 0-11 are the major template rolled to each pitch, rows 12-23 the minor one.
+    # Rows are centered and scaled to unit norm so a dot product with the centered
+    # chroma mean ranks keys exactly like a Pearson correlation would.
+    templates = np.stack(
+        [np.roll(MAJOR_TEMPLATE, i) for i in range(12)] + [np.roll(MINOR_TEMPLATE, i) for i in range(12)]
+    )
+    templates -= templates.mean(axis=1, keepdims=True)
+    templates /= np.linalg.norm(templates, axis=1, keepdims=True)
+    # float32 matches librosa's chroma dtype and is ample precision for picking a key.
+    return np.ascontiguousarray(templates, dtype=np.float32)
+
+
+KEY_TEMPLATES = _build_key_templates() if np is not None else None
+
+
 def _key_from_chroma(chroma) -> tuple[str, str]:
-    pitch_names = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
-    major_template = [6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88]
-    minor_template = [6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17]
+    chroma_mean = chroma.mean(axis=1, dtype=np.float32)
+    centered = chroma_mean - chroma_mean.mean()
+    if not np.any(centered):
+        return "C", "unknown"
 
-    import numpy as np
+    # The chroma norm is a shared positive factor, so it cannot change the argmax.
+    best = int(np.argmax(KEY_TEMPLATES @ centered))
+    return PITCH_NAMES[best % 12], ("major" if best < 12 else "minor")
 
-    chroma_mean = chroma.mean(axis=1)
-    best_key = "C"
-    best_mode = "unknown"
-    best_score = -1.0
-
-    for i, pitch in enumerate(pitch_names):
-        major = np.roll(major_template, i)
-        minor = np.roll(minor_template, i)
-        major_score = float(np.corrcoef(chroma_mean, major)[0, 1])
-        minor_score = float(np.corrcoef(chroma_mean, minor)[0, 1])
-        if major_score > best_score:
-            best_score = major_score
-            best_key = pitch
-            best_mode = "major"
-        if minor_score > best_score:
-            best_score = minor_score
-            best_key = pitch
-            best_mode = "minor"
-    return best_key, best_mode
 
+def _segment_stats(cum_abs, segs, sr):
+    count = segs.shape[0]
+    starts = np.empty(count, dtype=np.float64)
+    ends = np.empty(count, dtype=np.float64)
+    energies = np.zeros(count, dtype=np.float64)
+    for idx in range(count):
+        start = segs[idx, 0]
+        end = segs[idx, 1]
+        starts[idx] = start / sr
+        ends[idx] = end / sr
+        if end > start:
+            energies[idx] = (cum_abs[end] - cum_abs[start]) / (end - start)
+    return starts, ends, energies
 
-def analyze_audio(audio_path: str, cache: CacheStore, sample_rate: int = 22050) -> FeatureResult:
-    audio_key = cache.normalize_key(audio_path)
-    cached_feature_path = cache.get_feature_path(audio_key)
-    if cached_feature_path:
-        payload = json.loads(Path(cached_feature_path).read_text())
-        return FeatureResult.model_validate(payload)
 
-    try:
-        import librosa
-        import numpy as np
-    except ImportError as exc:
-        raise AnalysisError("ANALYSIS_LIBROSA_MISSING", "librosa/numpy is required for analysis") from exc
+if njit is not None:
+    _segment_stats = njit(cache=True)(_segment_stats)
 
+
+def _extract_features(audio_path: str, sample_rate: int) -> FeatureResult:
     try:
         y, sr = librosa.load(audio_path, sr=sample_rate, mono=True)
     except Exception as exc:
@@ -57,34 +86,37 @@ def analyze_audio(audio_path: str, cache: CacheStore, sample_rate: int = 22050)
     if y.size == 0:
         raise AnalysisError("ANALYSIS_EMPTY_AUDIO", "Audio payload is empty")
 
+    duration_sec = y.size / sr
     tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
     rms = librosa.feature.rms(y=y)[0]
+    # A single call partitions rms once for both quantiles instead of once per percentile.
+    rms_p5, rms_p95 = np.percentile(rms, [5, 95])
     spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
     onset_env = librosa.onset.onset_strength(y=y, sr=sr)
     onset_frames = librosa.onset.onset_detect(onset_envelope=onset_env, sr=sr)
-    onset_density = float(len(onset_frames) / max(1.0, librosa.get_duration(y=y, sr=sr)))
+    onset_density = float(len(onset_frames) / max(1.0, duration_sec))
 
     chroma = librosa.feature.chroma_stft(y=y, sr=sr)
     key, mode = _key_from_chroma(chroma)
 
-    duration_sec = librosa.get_duration(y=y, sr=sr)
     segs = librosa.effects.split(y, top_db=28)
+    abs_y = np.abs(y)
+    # Prefix sums turn every section mean into two lookups instead of a slice reduction.
+    cum_abs = np.zeros(abs_y.size + 1, dtype=np.float64)
+    np.cumsum(abs_y, out=cum_abs[1:])
+    starts, ends, energies = _segment_stats(cum_abs, np.ascontiguousarray(segs[:12], dtype=np.int64), int(sr))
     section_map = [
-        {
-            "start_sec": float(s / sr),
-            "end_sec": float(e / sr),
-            "energy": float(np.mean(np.abs(y[s:e]))) if e > s else 0.0,
-        }
-        for s, e in segs[:12]
+        {"start_sec": start, "end_sec": end, "energy": energy}
+        for start, end, energy in zip(starts.tolist(), ends.tolist(), energies.tolist())
     ]
 
-    feature = FeatureResult(
+    return FeatureResult(
         tempo_bpm=float(tempo),
         key=key,
         mode=mode,
         loudness_rms=float(rms.mean()),
-        dynamic_range=float(np.percentile(rms, 95) - np.percentile(rms, 5)),
-        energy_mean=float(np.mean(np.abs(y))),
+        dynamic_range=float(rms_p95 - rms_p5),
+        energy_mean=float(cum_abs[-1] / abs_y.size),
         spectral_centroid_mean=float(spectral_centroid.mean()),
         onset_density=onset_density,
         section_map=section_map,
@@ -93,7 +125,49 @@ def analyze_audio(audio_path: str, cache: CacheStore, sample_rate: int = 22050)
         },
     )
 
+
+_ANALYSIS_POOL: ProcessPoolExecutor | None = None
+_ANALYSIS_POOL_LOCK = threading.Lock()
+# listen_batch already runs listens on threads and the orchestrator admits four downloads at once.
+_ANALYSIS_MAX_WORKERS = 4
+
+
+# Opt-in: a worker process re-imports librosa, which only pays off when many listens run at once.
+def _analysis_pool() -> ProcessPoolExecutor | None:
+    global _ANALYSIS_POOL
+    if os.getenv("LISTEN_PARALLEL_ANALYSIS", "0") != "1":
+        return None
+    with _ANALYSIS_POOL_LOCK:
+        if _ANALYSIS_POOL is None:
+            # Spawn, not fork: the lyrics, discovery and descriptor threads may hold locks (including
+            # the HTTP session's pool locks) that a forked child would inherit in a locked state.
+            _ANALYSIS_POOL = ProcessPoolExecutor(
+                max_workers=min(_ANALYSIS_MAX_WORKERS, os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            atexit.register(_ANALYSIS_POOL.shutdown)
+        return _ANALYSIS_POOL
+
+
+def analyze_audio(audio_path: str, cache: CacheStore, sample_rate: int = 22050) -> FeatureResult:
+    audio_key = cache.normalize_key(audio_path)
+    cached_feature_path = cache.get_feature_path(audio_key)
+    if cached_feature_path:
+        # Feature files are only ever written below from a validated FeatureResult.
+        payload = orjson.loads(Path(cached_feature_path).read_bytes())
+        return FeatureResult.model_construct(**payload)
+
+    if librosa is None or np is None:
+        raise AnalysisError("ANALYSIS_LIBROSA_MISSING", "librosa/numpy is required for analysis")
+
+    # Only the extraction crosses the process boundary; the sqlite-backed cache stays here.
+    pool = _analysis_pool()
+    if pool is not None:
+        feature = pool.submit(_extract_features, audio_path, sample_rate).result()
+    else:
+        feature = _extract_features(audio_path, sample_rate)
+
     feature_path = cache.feature_dir / f"{audio_key}.json"
-    feature_path.write_text(feature.model_dump_json(indent=2))
+    feature_path.write_bytes(orjson.dumps(feature.model_dump(), option=orjson.OPT_INDENT_2))
     cache.put_feature_path(audio_key, str(feature_path))
     return feature
@@ -3,12 +3,112 @@ from __future__ import annotations
 import hashlib
 import os
 import sqlite3
+import threading
 import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
+
+
+@lru_cache(maxsize=2048)
+def _normalize_key(value: str) -> str:
+    # Keys name cached audio/feature files on disk, so changing the digest invalidates
+    # every existing cache. SHA-256 also beats BLAKE2b here on SHA-NI capable CPUs.
+    return hashlib.sha256(value.strip().lower().encode("utf-8")).hexdigest()
+
+
+class _MemoryLRU:
+    def __init__(self, maxsize: int = 2048) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
 
 
 class CacheStore:
+    _SQL_CACHE_STATUS = """
+        SELECT 'query', NULL FROM query_cache WHERE query_key = ?1
+        UNION ALL SELECT 'audio', audio_path FROM source_audio WHERE source_key = ?1
+        UNION ALL SELECT 'feature', feature_path FROM feature_cache WHERE audio_key = ?1
+        UNION ALL SELECT 'lyrics', NULL FROM lyrics_cache WHERE source_key = ?1
+        UNION ALL SELECT 'lyrics_analysis', NULL FROM lyrics_analysis_cache WHERE lyrics_key = ?1
+    """
+    _SQL_GET_QUERY = "SELECT payload, created_at FROM query_cache WHERE query_key = ?"
+    _SQL_GET_AUDIO = "SELECT audio_path, format FROM source_audio WHERE source_key = ?"
+    _SQL_GET_FEATURE = "SELECT feature_path FROM feature_cache WHERE audio_key = ?"
+    _SQL_GET_LYRICS = "SELECT lyrics_json FROM lyrics_cache WHERE source_key = ?"
+    _SQL_GET_LYRICS_ANALYSIS = "SELECT analysis_json FROM lyrics_analysis_cache WHERE lyrics_key = ?"
+    _SQL_GET_KV = "SELECT value, expires_at FROM kv_cache WHERE kv_key = ? AND expires_at > ?"
+    _SQL_GET_KV_ANY = "SELECT value, expires_at FROM kv_cache WHERE kv_key = ?"
+    _SQL_PUT_QUERY = """
+        INSERT INTO query_cache(query_key, payload, created_at)
+        VALUES(?, ?, ?)
+        ON CONFLICT(query_key) DO UPDATE SET
+          payload = excluded.payload,
+          created_at = excluded.created_at
+    """
+    _SQL_PUT_AUDIO = """
+        INSERT INTO source_audio(source_key, audio_path, format, created_at)
+        VALUES(?, ?, ?, ?)
+        ON CONFLICT(source_key) DO UPDATE SET
+          audio_path = excluded.audio_path,
+          format = excluded.format,
+          created_at = excluded.created_at
+    """
+    _SQL_PUT_FEATURE = """
+        INSERT INTO feature_cache(audio_key, feature_path, created_at)
+        VALUES(?, ?, ?)
+        ON CONFLICT(audio_key) DO UPDATE SET
+          feature_path = excluded.feature_path,
+          created_at = excluded.created_at
+    """
+    _SQL_PUT_LYRICS = """
+        INSERT INTO lyrics_cache(source_key, lyrics_json, created_at)
+        VALUES(?, ?, ?)
+        ON CONFLICT(source_key) DO UPDATE SET
+          lyrics_json = excluded.lyrics_json,
+          created_at = excluded.created_at
+    """
+    _SQL_PUT_LYRICS_ANALYSIS = """
+        INSERT INTO lyrics_analysis_cache(lyrics_key, analysis_json, created_at)
+        VALUES(?, ?, ?)
+        ON CONFLICT(lyrics_key) DO UPDATE SET
+          analysis_json = excluded.analysis_json,
+          created_at = excluded.created_at
+    """
+
+    _SQL_PUT_KV = """
+        INSERT INTO kv_cache(kv_key, value, expires_at)
+        VALUES(?, ?, ?)
+        ON CONFLICT(kv_key) DO UPDATE SET
+          value = excluded.value,
+          expires_at = excluded.expires_at
+    """
+    _SQL_DELETE_KV = "DELETE FROM kv_cache WHERE kv_key = ?"
+
     def __init__(self, root_dir: str = "./cache", sqlite_path: str = "./cache/index.sqlite"):
         self.root_dir = Path(root_dir)
         self.audio_dir = self.root_dir / "audio"
@@ -19,12 +119,28 @@ class CacheStore:
         self.feature_dir.mkdir(parents=True, exist_ok=True)
         self.sqlite_path.parent.mkdir(parents=True, exist_ok=True)
 
-        self.conn = sqlite3.connect(self.sqlite_path)
+        # Discovery and descriptor lookups run on worker threads, so the connection is shared
+        # across threads and writes are serialized through a lock.
+        self.conn = sqlite3.connect(self.sqlite_path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._in_transaction = False
+        # Warm rows are served from memory; misses are not remembered since other processes may write.
+        self._query_mem = _MemoryLRU()
+        self._audio_mem = _MemoryLRU()
+        self._feature_mem = _MemoryLRU()
+        self._configure()
         self._init_tables()
 
+    def _configure(self) -> None:
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-65536")
+        self.conn.execute("PRAGMA mmap_size=268435456")
+        self.conn.execute("PRAGMA cache_spill=0")
+
     def _init_tables(self) -> None:
-        cur = self.conn.cursor()
-        cur.execute(
+        self.conn.execute(
             """
             CREATE TABLE IF NOT EXISTS query_cache (
                 query_key TEXT PRIMARY KEY,
@@ -33,7 +149,7 @@ class CacheStore:
             )
             """
         )
-        cur.execute(
+        self.conn.execute(
             """
             CREATE TABLE IF NOT EXISTS source_audio (
                 source_key TEXT PRIMARY KEY,
@@ -43,7 +159,7 @@ class CacheStore:
             )
             """
         )
-        cur.execute(
+        self.conn.execute(
             """
             CREATE TABLE IF NOT EXISTS feature_cache (
                 audio_key TEXT PRIMARY KEY,
@@ -52,7 +168,7 @@ class CacheStore:
             )
             """
         )
-        cur.execute(
+        self.conn.execute(
             """
             CREATE TABLE IF NOT EXISTS lyrics_cache (
                 source_key TEXT PRIMARY KEY,
@@ -61,7 +177,7 @@ class CacheStore:
             )
             """
         )
-        cur.execute(
+        self.conn.execute(
             """
             CREATE TABLE IF NOT EXISTS lyrics_analysis_cache (
                 lyrics_key TEXT PRIMARY KEY,
@@ -70,20 +186,57 @@ class CacheStore:
             )
             """
         )
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS kv_cache (
+                kv_key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at INTEGER NOT NULL
+            )
+            """
+        )
         self.conn.commit()
 
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        # Groups several put_* calls into one commit; nested use joins the outer transaction.
+        with self._lock:
+            if self._in_transaction:
+                yield
+                return
+            self._in_transaction = True
+            try:
+                yield
+            except BaseException:
+                self.conn.rollback()
+                self._query_mem.clear()
+                self._audio_mem.clear()
+                self._feature_mem.clear()
+                raise
+            else:
+                self.conn.commit()
+            finally:
+                self._in_transaction = False
+
+    def _commit(self) -> None:
+        if not self._in_transaction:
+            self.conn.commit()
+
     @staticmethod
     def normalize_key(value: str) -> str:
-        return hashlib.sha256(value.strip().lower().encode("utf-8")).hexdigest()
+        return _normalize_key(value)
 
     def get_query(self, query: str, ttl_sec: int) -> str | None:
         query_key = self.normalize_key(query)
-        cur = self.conn.cursor()
-        row = cur.execute(
-            "SELECT payload, created_at FROM query_cache WHERE query_key = ?", (query_key,)
-        ).fetchone()
-        if not row:
-            return None
+        row = self._query_mem.get(query_key)
+        if row is None:
+            # Reads share the connection with transaction(); without the lock another thread could
+            # see, and memoize, rows that are about to be rolled back.
+            with self._lock:
+                row = self.conn.execute(self._SQL_GET_QUERY, (query_key,)).fetchone()
+                if not row:
+                    return None
+                self._query_mem.put(query_key, row)
         payload, created_at = row
         if int(time.time()) - created_at > ttl_sec:
             return None
@@ -91,134 +244,124 @@ class CacheStore:
 
     def put_query(self, query: str, payload: str) -> None:
         query_key = self.normalize_key(query)
-        cur = self.conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO query_cache(query_key, payload, created_at)
-            VALUES(?, ?, ?)
-            ON CONFLICT(query_key) DO UPDATE SET
-              payload = excluded.payload,
-              created_at = excluded.created_at
-            """,
-            (query_key, payload, int(time.time())),
-        )
-        self.conn.commit()
+        created_at = int(time.time())
+        with self._lock:
+            self.conn.execute(self._SQL_PUT_QUERY, (query_key, payload, created_at))
+            self._commit()
+            # Rows written inside a transaction reach the memory layer on a read after commit.
+            if not self._in_transaction:
+                self._query_mem.put(query_key, (payload, created_at))
 
     def get_audio(self, source_key: str) -> tuple[str, str] | None:
-        cur = self.conn.cursor()
-        row = cur.execute(
-            "SELECT audio_path, format FROM source_audio WHERE source_key = ?", (source_key,)
-        ).fetchone()
-        if not row:
-            return None
+        row = self._audio_mem.get(source_key)
+        if row is None:
+            with self._lock:
+                row = self.conn.execute(self._SQL_GET_AUDIO, (source_key,)).fetchone()
+                if not row:
+                    return None
+                self._audio_mem.put(source_key, row)
         audio_path, fmt = row
         if not os.path.exists(audio_path):
+            self._audio_mem.pop(source_key)
             return None
         return audio_path, fmt
 
     def put_audio(self, source_key: str, audio_path: str, fmt: str) -> None:
-        cur = self.conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO source_audio(source_key, audio_path, format, created_at)
-            VALUES(?, ?, ?, ?)
-            ON CONFLICT(source_key) DO UPDATE SET
-              audio_path = excluded.audio_path,
-              format = excluded.format,
-              created_at = excluded.created_at
-            """,
-            (source_key, audio_path, fmt, int(time.time())),
-        )
-        self.conn.commit()
+        with self._lock:
+            self.conn.execute(self._SQL_PUT_AUDIO, (source_key, audio_path, fmt, int(time.time())))
+            self._commit()
+            if not self._in_transaction:
+                self._audio_mem.put(source_key, (audio_path, fmt))
 
     def get_feature_path(self, audio_key: str) -> str | None:
-        cur = self.conn.cursor()
-        row = cur.execute(
-            "SELECT feature_path FROM feature_cache WHERE audio_key = ?", (audio_key,)
-        ).fetchone()
-        if not row:
-            return None
-        feature_path = row[0]
+        feature_path = self._feature_mem.get(audio_key)
+        if feature_path is None:
+            with self._lock:
+                row = self.conn.execute(self._SQL_GET_FEATURE, (audio_key,)).fetchone()
+                if not row:
+                    return None
+                feature_path = row[0]
+                self._feature_mem.put(audio_key, feature_path)
         if not os.path.exists(feature_path):
+            self._feature_mem.pop(audio_key)
             return None
         return feature_path
 
     def put_feature_path(self, audio_key: str, feature_path: str) -> None:
-        cur = self.conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO feature_cache(audio_key, feature_path, created_at)
-            VALUES(?, ?, ?)
-            ON CONFLICT(audio_key) DO UPDATE SET
-              feature_path = excluded.feature_path,
-              created_at = excluded.created_at
-            """,
-            (audio_key, feature_path, int(time.time())),
-        )
-        self.conn.commit()
+        with self._lock:
+            self.conn.execute(self._SQL_PUT_FEATURE, (audio_key, feature_path, int(time.time())))
+            self._commit()
+            if not self._in_transaction:
+                self._feature_mem.put(audio_key, feature_path)
 
     def get_lyrics(self, source_key: str) -> str | None:
-        cur = self.conn.cursor()
-        row = cur.execute(
-            "SELECT lyrics_json FROM lyrics_cache WHERE source_key = ?", (source_key,)
-        ).fetchone()
+        with self._lock:
+            row = self.conn.execute(self._SQL_GET_LYRICS, (source_key,)).fetchone()
         if not row:
             return None
         return row[0]
 
+    def get_lyrics_many(self, source_keys: list[str]) -> dict[str, str]:
+        found: dict[str, str] = {}
+        # Chunked to stay under SQLite's bound-parameter limit.
+        for start in range(0, len(source_keys), 500):
+            chunk = source_keys[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self.conn.execute(
+                    f"SELECT source_key, lyrics_json FROM lyrics_cache WHERE source_key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+            found.update(rows)
+        return found
+
     def put_lyrics(self, source_key: str, lyrics_json: str) -> None:
-        cur = self.conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO lyrics_cache(source_key, lyrics_json, created_at)
-            VALUES(?, ?, ?)
-            ON CONFLICT(source_key) DO UPDATE SET
-              lyrics_json = excluded.lyrics_json,
-              created_at = excluded.created_at
-            """,
-            (source_key, lyrics_json, int(time.time())),
-        )
-        self.conn.commit()
+        with self._lock:
+            self.conn.execute(self._SQL_PUT_LYRICS, (source_key, lyrics_json, int(time.time())))
+            self._commit()
 
     def get_lyrics_analysis(self, lyrics_key: str) -> str | None:
-        cur = self.conn.cursor()
-        row = cur.execute(
-            "SELECT analysis_json FROM lyrics_analysis_cache WHERE lyrics_key = ?", (lyrics_key,)
-        ).fetchone()
+        with self._lock:
+            row = self.conn.execute(self._SQL_GET_LYRICS_ANALYSIS, (lyrics_key,)).fetchone()
         if not row:
             return None
         return row[0]
 
     def put_lyrics_analysis(self, lyrics_key: str, analysis_json: str) -> None:
-        cur = self.conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO lyrics_analysis_cache(lyrics_key, analysis_json, created_at)
-            VALUES(?, ?, ?)
-            ON CONFLICT(lyrics_key) DO UPDATE SET
-              analysis_json = excluded.analysis_json,
-              created_at = excluded.created_at
-            """,
-            (lyrics_key, analysis_json, int(time.time())),
-        )
-        self.conn.commit()
+        with self._lock:
+            self.conn.execute(self._SQL_PUT_LYRICS_ANALYSIS, (lyrics_key, analysis_json, int(time.time())))
+            self._commit()
+
+    def get_kv(self, key: str, include_expired: bool = False) -> tuple[str, int] | None:
+        with self._lock:
+            if include_expired:
+                row = self.conn.execute(self._SQL_GET_KV_ANY, (self.normalize_key(key),)).fetchone()
+            else:
+                row = self.conn.execute(self._SQL_GET_KV, (self.normalize_key(key), int(time.time()))).fetchone()
+        if not row:
+            return None
+        return row[0], row[1]
+
+    def put_kv(self, key: str, value: str, expires_at: int) -> None:
+        with self._lock:
+            self.conn.execute(self._SQL_PUT_KV, (self.normalize_key(key), value, expires_at))
+            self._commit()
+
+    def delete_kv(self, key: str) -> None:
+        with self._lock:
+            self.conn.execute(self._SQL_DELETE_KV, (self.normalize_key(key),))
+            self._commit()
 
     def cache_status(self, key: str) -> dict[str, Any]:
         query_key = self.normalize_key(key)
-        cur = self.conn.cursor()
-        q = cur.execute("SELECT created_at FROM query_cache WHERE query_key = ?", (query_key,)).fetchone()
-        a = cur.execute("SELECT audio_path, created_at FROM source_audio WHERE source_key = ?", (query_key,)).fetchone()
-        f = cur.execute("SELECT feature_path, created_at FROM feature_cache WHERE audio_key = ?", (query_key,)).fetchone()
+        with self._lock:
+            found = dict(self.conn.execute(self._SQL_CACHE_STATUS, (query_key,)).fetchall())
         return {
-            "query_cached": bool(q),
-            "audio_cached": bool(a),
-            "feature_cached": bool(f),
-            "lyrics_cached": bool(
-                cur.execute("SELECT 1 FROM lyrics_cache WHERE source_key = ?", (query_key,)).fetchone()
-            ),
-            "lyrics_analysis_cached": bool(
-                cur.execute("SELECT 1 FROM lyrics_analysis_cache WHERE lyrics_key = ?", (query_key,)).fetchone()
-            ),
-            "audio_path": a[0] if a else None,
-            "feature_path": f[0] if f else None,
+            "query_cached": "query" in found,
+            "audio_cached": "audio" in found,
+            "feature_cached": "feature" in found,
+            "lyrics_cached": "lyrics" in found,
+            "lyrics_analysis_cached": "lyrics_analysis" in found,
+            "audio_path": found.get("audio"),
+            "feature_path": found.get("feature"),
         }
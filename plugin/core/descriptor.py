@@ -1,11 +1,20 @@
 from __future__ import annotations
 
-from typing import Any
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
 
+import orjson
 import requests
 
+from .cache import CacheStore
+from .http import SESSION
 from .models import DescriptorArtifact, MetadataArtifact, SourceCandidate
 
+# MusicBrainz ids and AcousticBrainz dumps do not change for a recording, so hits are kept for a month.
+_LOOKUP_TTL_SEC = 30 * 86400
+_ETAG_TTL_SEC = 365 * 86400
+
 
 def _nested(payload: dict[str, Any], path: list[str]) -> Any:
     cur: Any = payload
@@ -29,18 +38,37 @@ def _settings_descriptors(settings: dict[str, Any]) -> dict[str, Any]:
     return settings.get("descriptors") or {}
 
 
-def _find_mbid(metadata: MetadataArtifact | None, source: SourceCandidate, timeout_sec: int) -> str | None:
-    params: dict[str, str] = {"fmt": "json", "limit": "1"}
-    headers = {"User-Agent": "openclaw-listen/0.1"}
+def _cached_lookup(cache: CacheStore | None, key: str, fetch: Callable[[], Any]) -> Any:
+    if cache is not None:
+        stored = cache.get_kv(key)
+        if stored:
+            return orjson.loads(stored[0])
+    value = fetch()
+    # Misses are not stored so a transient provider failure is retried on the next listen.
+    if value is not None and cache is not None:
+        cache.put_kv(key, orjson.dumps(value).decode(), int(time.time()) + _LOOKUP_TTL_SEC)
+    return value
+
+
+def _find_mbid(
+    metadata: MetadataArtifact | None,
+    source: SourceCandidate,
+    timeout_sec: int,
+    cache: CacheStore | None = None,
+) -> str | None:
     if metadata and metadata.isrc:
-        params["query"] = f"isrc:{metadata.isrc}"
+        query = f"isrc:{metadata.isrc}"
     else:
         title = metadata.title if metadata and metadata.title else source.title
         artist = ", ".join(metadata.artists) if metadata and metadata.artists else (source.artist_guess or "")
-        params["query"] = f'recording:"{title}" AND artist:"{artist}"'.strip()
+        query = f'recording:"{title}" AND artist:"{artist}"'.strip()
+    return _cached_lookup(cache, f"descriptor:musicbrainz:{query}", lambda: _lookup_mbid(query, timeout_sec))
+
 
+def _lookup_mbid(query: str, timeout_sec: int) -> str | None:
+    params = {"fmt": "json", "limit": "1", "query": query}
     try:
-        resp = requests.get("https://musicbrainz.org/ws/2/recording", params=params, headers=headers, timeout=timeout_sec)
+        resp = SESSION.get("https://musicbrainz.org/ws/2/recording", params=params, timeout=timeout_sec)
     except requests.RequestException:
         return None
     if resp.status_code != 200:
@@ -54,30 +82,63 @@ def _find_mbid(metadata: MetadataArtifact | None, source: SourceCandidate, timeo
     return str(mbid) if mbid else None
 
 
-def _fetch_acousticbrainz(mbid: str, timeout_sec: int) -> tuple[dict[str, Any] | None, dict[str, Any] | None]:
-    base = "https://acousticbrainz.org"
-    low = None
-    high = None
-    try:
-        low_resp = requests.get(f"{base}/{mbid}/low-level", params={"n": 0}, timeout=timeout_sec)
-        if low_resp.status_code == 200:
-            low = low_resp.json()
-    except requests.RequestException:
-        low = None
+def _fetch_acousticbrainz(mbid: str, level: str, timeout_sec: int, cache: CacheStore | None = None) -> dict[str, Any] | None:
+    lookup_key = f"descriptor:acousticbrainz:{mbid}:{level}"
+    return _cached_lookup(cache, lookup_key, lambda: _request_acousticbrainz(mbid, level, timeout_sec, cache, lookup_key))
+
+
+def _request_acousticbrainz(
+    mbid: str,
+    level: str,
+    timeout_sec: int,
+    cache: CacheStore | None = None,
+    lookup_key: str | None = None,
+) -> dict[str, Any] | None:
+    url = f"https://acousticbrainz.org/{mbid}/{level}"
+    # Once the cached lookup lapses, its ETag lets the server confirm the expired copy with a bodiless 304.
+    etag_key = f"descriptor:etag:{url}"
+    etag: str | None = None
+    stale_body: str | None = None
+    if cache is not None and lookup_key:
+        stored_etag = cache.get_kv(etag_key)
+        stale = cache.get_kv(lookup_key, include_expired=True) if stored_etag else None
+        if stored_etag and stale:
+            etag, stale_body = stored_etag[0], stale[0]
+    headers = {"If-None-Match": etag} if etag else None
 
     try:
-        high_resp = requests.get(f"{base}/{mbid}/high-level", params={"n": 0}, timeout=timeout_sec)
-        if high_resp.status_code == 200:
-            high = high_resp.json()
-    except requests.RequestException:
-        high = None
-    return low, high
+        resp = SESSION.get(url, params={"n": 0}, headers=headers, timeout=timeout_sec)
+        if resp.status_code == 304 and stale_body is not None:
+            return orjson.loads(stale_body)
+        if resp.status_code != 200:
+            return None
+        payload = resp.json()
+    except (requests.RequestException, ValueError):
+        return None
+    new_etag = resp.headers.get("ETag")
+    if new_etag and cache is not None:
+        cache.put_kv(etag_key, new_etag, int(time.time()) + _ETAG_TTL_SEC)
+    return payload
+
+
+def _fetch_deezer_track(
+    metadata: MetadataArtifact | None,
+    source: SourceCandidate,
+    timeout_sec: int,
+    cache: CacheStore | None = None,
+) -> dict[str, Any] | None:
+    isrc = metadata.isrc if metadata else None
+    return _cached_lookup(
+        cache,
+        f"descriptor:deezer:{isrc or ''}:{source.title}:{source.artist_guess or ''}",
+        lambda: _request_deezer_track(metadata, source, timeout_sec),
+    )
 
 
-def _fetch_deezer_track(metadata: MetadataArtifact | None, source: SourceCandidate, timeout_sec: int) -> dict[str, Any] | None:
+def _request_deezer_track(metadata: MetadataArtifact | None, source: SourceCandidate, timeout_sec: int) -> dict[str, Any] | None:
     if metadata and metadata.isrc:
         try:
-            resp = requests.get(f"https://api.deezer.com/track/isrc:{metadata.isrc}", timeout=timeout_sec)
+            resp = SESSION.get(f"https://api.deezer.com/track/isrc:{metadata.isrc}", timeout=timeout_sec)
             if resp.status_code == 200:
                 payload = resp.json()
                 if isinstance(payload, dict) and payload.get("id"):
@@ -92,7 +153,7 @@ def _fetch_deezer_track(metadata: MetadataArtifact | None, source: SourceCandida
     if not query:
         return None
     try:
-        resp = requests.get("https://api.deezer.com/search", params={"q": query}, timeout=timeout_sec)
+        resp = SESSION.get("https://api.deezer.com/search", params={"q": query}, timeout=timeout_sec)
     except requests.RequestException:
         return None
     if resp.status_code != 200:
@@ -143,6 +204,7 @@ def build_descriptor_artifact(
     source: SourceCandidate,
     metadata: MetadataArtifact | None,
     settings: dict[str, Any],
+    cache: CacheStore | None = None,
 ) -> DescriptorArtifact | None:
     cfg = _settings_descriptors(settings)
     if not cfg.get("enabled", True):
@@ -160,13 +222,21 @@ def build_descriptor_artifact(
         texture_proxy={"spectral_centroid_mean": None, "spectral_complexity_mean": None},
     )
 
-    mbid = _find_mbid(metadata, source, timeout_sec=timeout_sec)
-    low = None
-    high = None
-    if mbid:
-        low, high = _fetch_acousticbrainz(mbid, timeout_sec=timeout_sec)
-    else:
-        warnings.append("DESCRIPTOR_MBID_NOT_FOUND")
+    # Deezer does not depend on the MBID, so it overlaps with the MusicBrainz lookup;
+    # both AcousticBrainz levels are then fetched side by side.
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        deezer_future = pool.submit(_fetch_deezer_track, metadata, source, timeout_sec=timeout_sec, cache=cache)
+        mbid = _find_mbid(metadata, source, timeout_sec=timeout_sec, cache=cache)
+        low = None
+        high = None
+        if mbid:
+            low_future = pool.submit(_fetch_acousticbrainz, mbid, "low-level", timeout_sec=timeout_sec, cache=cache)
+            high_future = pool.submit(_fetch_acousticbrainz, mbid, "high-level", timeout_sec=timeout_sec, cache=cache)
+            low = low_future.result()
+            high = high_future.result()
+        else:
+            warnings.append("DESCRIPTOR_MBID_NOT_FOUND")
+        deezer_track = deezer_future.result()
 
     if low:
         sources_used.append("acousticbrainz.low-level")
@@ -221,7 +291,6 @@ def build_descriptor_artifact(
             descriptor.instrumentalness_proxy = instrumental
             coverage["instrumentalness_proxy"] = "direct"
 
-    deezer_track = _fetch_deezer_track(metadata, source, timeout_sec=timeout_sec)
     if deezer_track:
         sources_used.append("deezer.track")
         if coverage["tempo_bpm"] == "missing":
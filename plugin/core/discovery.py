@@ -1,41 +1,64 @@
 from __future__ import annotations
 
-import json
+import heapq
 import os
 import re
 import subprocess
+import sys
 import unicodedata
-from difflib import SequenceMatcher
-from typing import Any
-
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable
+
+import numpy as np
+import orjson
 import requests
+from rapidfuzz import fuzz, process
 
+from .cache import CacheStore
 from .errors import DiscoveryError
+from .http import SESSION
 from .models import DiscoveryResult, SourceCandidate
 from .settings import load_settings
 from .spotify_client import SpotifyClientError, search_tracks
 
+_WS_RE = re.compile(r"\s+")
+# Punctuation, underscores and whitespace runs all collapse to one space in a single pass.
+_SEPARATOR_RE = re.compile(r"[\W_]+")
+_BY_CONFIDENCE = attrgetter("confidence")
+
+
+# Built on first use: scanning every code point costs ~80ms, which CLI startup should not pay.
+@lru_cache(maxsize=1)
+def _combining_marks() -> dict[int, None]:
+    return dict.fromkeys(cp for cp in range(sys.maxunicode + 1) if unicodedata.combining(chr(cp)))
 
+
+@lru_cache(maxsize=4096)
 def _fold_accents(text: str) -> str:
-    decomposed = unicodedata.normalize("NFKD", text)
-    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    # NFKD and mark stripping leave ASCII untouched, so the common English title skips both.
+    if text.isascii():
+        return text
+    return unicodedata.normalize("NFKD", text).translate(_combining_marks())
 
 
+# Titles are normalized during provider scoring, dedupe and the final rescoring pass.
+@lru_cache(maxsize=8192)
 def _normalize_text(text: str) -> str:
-    lowered = _fold_accents(text).lower()
-    lowered = re.sub(r"[^\w\s]", " ", lowered)
-    lowered = re.sub(r"_+", " ", lowered)
-    return re.sub(r"\s+", " ", lowered).strip()
+    return _SEPARATOR_RE.sub(" ", _fold_accents(text).lower()).strip()
 
 
-def _tokens(text: str) -> set[str]:
-    return {part for part in _normalize_text(text).split() if part}
+def _ratio(left: str, right: str) -> float:
+    return fuzz.ratio(left, right) / 100.0
 
 
-def _token_overlap(left: set[str], right: set[str]) -> float:
-    if not left:
+def _token_overlap(query_tokens: frozenset[str], text_n: str) -> float:
+    if not query_tokens:
         return 0.0
-    return len(left & right) / len(left)
+    # Count membership hits instead of materializing the intersection set.
+    return sum(map(query_tokens.__contains__, set(text_n.split()))) / len(query_tokens)
 
 
 def _resolve_ranking_weights(settings: dict[str, Any] | None = None) -> dict[str, float]:
@@ -46,7 +69,10 @@ def _resolve_ranking_weights(settings: dict[str, Any] | None = None) -> dict[str
         "duration_sanity": 0.10,
         "containment_bonus": 0.06,
     }
-    cfg = (((settings or {}).get("discovery") or {}).get("ranking_weights")) or {}
+    try:
+        cfg = settings["discovery"]["ranking_weights"]  # type: ignore[index]
+    except (KeyError, TypeError):
+        cfg = None
     if isinstance(cfg, dict):
         for key in defaults:
             value = cfg.get(key)
@@ -66,62 +92,117 @@ def _resolve_ranking_weights(settings: dict[str, Any] | None = None) -> dict[str
     return {key: value / total for key, value in defaults.items()}
 
 
-def _score(
-    query: str,
-    title: str,
-    artist_guess: str | None,
-    duration_sec: int | None,
-    weights: dict[str, float] | None = None,
-) -> float:
-    score_weights = weights or _resolve_ranking_weights(None)
+def _resolve_accept_threshold(settings: dict[str, Any]) -> float | None:
+    value = (settings.get("discovery") or {}).get("accept_threshold")
+    if isinstance(value, (int, float)) and 0.0 < value <= 1.0:
+        return float(value)
+    return None
+
+
+@dataclass(frozen=True, slots=True)
+class _ScoreCtx:
+    query_n: str
+    query_tokens: frozenset[str]
+    weights: dict[str, float]
+
+
+def _score_ctx(query: str, weights: dict[str, float] | None = None) -> _ScoreCtx:
     query_n = _normalize_text(query)
-    title_n = _normalize_text(title)
-    query_tokens = set(query_n.split())
-    title_tokens = set(title_n.split())
-
-    title_score = SequenceMatcher(None, query_n, title_n).ratio()
-    title_token_score = _token_overlap(query_tokens, title_tokens)
-
-    artist_score = 0.0
-    if artist_guess:
-        artist_n = _normalize_text(artist_guess)
-        artist_seq = SequenceMatcher(None, query_n, artist_n).ratio()
-        artist_token = _token_overlap(query_tokens, _tokens(artist_guess))
-        artist_score = max(artist_seq, artist_token)
-
-    duration_score = 1.0 if duration_sec and 60 <= duration_sec <= 720 else 0.5
-    containment_score = 1.0 if query_n and title_n and (query_n in title_n or title_n in query_n) else 0.0
-
-    score = (
-        score_weights["title_similarity"] * title_score
-        + score_weights["title_token_overlap"] * title_token_score
-        + score_weights["artist_similarity"] * artist_score
-        + score_weights["duration_sanity"] * duration_score
-        + score_weights["containment_bonus"] * containment_score
+    return _ScoreCtx(
+        query_n=query_n,
+        query_tokens=frozenset(query_n.split()),
+        weights=weights or _resolve_ranking_weights(None),
+    )
+
+
+def _score_batch(
+    ctx: _ScoreCtx,
+    titles: list[str],
+    artists: list[str | None],
+    durations: list[int | None],
+):
+    score_weights = ctx.weights
+    query_n = ctx.query_n
+    query_tokens = ctx.query_tokens
+
+    titles_n = [_normalize_text(title) for title in titles]
+    title_token_scores = np.array([_token_overlap(query_tokens, t) for t in titles_n], dtype=np.float64)
+    containment_scores = np.array(
+        [1.0 if query_n and t and (query_n in t or t in query_n) else 0.0 for t in titles_n],
+        dtype=np.float64,
+    )
+
+    artists_n = [_normalize_text(artist) if artist else "" for artist in artists]
+    artist_token_scores = np.array([_token_overlap(query_tokens, a) for a in artists_n], dtype=np.float64)
+
+    # Approximation: string similarity is only computed for candidates sharing a title or artist
+    # token with the query, or with containment. The rest score on duration alone, which also drops
+    # pure typo matches ("Bohemain Rapsody" by "Qeen"). The rule is per candidate, keeping batch
+    # and single-candidate scores identical.
+    live = np.flatnonzero((title_token_scores > 0.0) | (containment_scores > 0.0) | (artist_token_scores > 0.0))
+    title_scores = np.zeros(len(titles_n), dtype=np.float64)
+    artist_scores = np.zeros(len(titles_n), dtype=np.float64)
+    if live.size:
+        live_titles = [titles_n[i] for i in live]
+        live_artists = [artists_n[i] for i in live]
+        title_scores[live] = process.cdist([query_n], live_titles, scorer=fuzz.ratio, dtype=np.float64)[0] / 100.0
+        artist_seq = process.cdist([query_n], live_artists, scorer=fuzz.ratio, dtype=np.float64)[0] / 100.0
+        has_artist = np.array([bool(a) for a in live_artists], dtype=bool)
+        artist_scores[live] = np.where(has_artist, np.maximum(artist_seq, artist_token_scores[live]), 0.0)
+
+    duration_values = np.fromiter((d or 0 for d in durations), dtype=np.float64, count=len(durations))
+    duration_scores = np.where((duration_values >= 60) & (duration_values <= 720), 1.0, 0.5)
+
+    scores = (
+        score_weights["title_similarity"] * title_scores
+        + score_weights["title_token_overlap"] * title_token_scores
+        + score_weights["artist_similarity"] * artist_scores
+        + score_weights["duration_sanity"] * duration_scores
+        + score_weights["containment_bonus"] * containment_scores
     )
-    return max(0.0, min(1.0, score))
+    return np.clip(scores, 0.0, 1.0)
+
+
+def _assign_confidences(ctx: _ScoreCtx, candidates: list[SourceCandidate]) -> None:
+    if not candidates:
+        return
+    scores = _score_batch(
+        ctx,
+        [c.title for c in candidates],
+        [c.artist_guess for c in candidates],
+        [c.duration_sec for c in candidates],
+    )
+    for candidate, confidence in zip(candidates, scores.tolist()):
+        candidate.confidence = confidence
 
 
 def _canonical_candidate_key(candidate: SourceCandidate) -> tuple[str, str]:
     return (_normalize_text(candidate.title), _normalize_text(candidate.artist_guess or ""))
 
 
-def _dedupe_candidates(candidates: list[SourceCandidate]) -> list[SourceCandidate]:
+def _merge_candidate(
+    deduped: dict[tuple[str, str], SourceCandidate],
+    key: tuple[str, str],
+    candidate: SourceCandidate,
+) -> None:
+    existing = deduped.get(key)
+    if existing is None:
+        deduped[key] = candidate
+        return
+    prefers_youtube = candidate.source_type == "youtube" and existing.source_type != "youtube"
+    existing_is_youtube = existing.source_type == "youtube"
+    should_replace = candidate.confidence > existing.confidence and not (
+        existing_is_youtube and candidate.source_type != "youtube"
+    )
+    if prefers_youtube or should_replace:
+        deduped[key] = candidate
+
+
+def _dedupe_candidates(candidates: list[SourceCandidate]) -> dict[tuple[str, str], SourceCandidate]:
     deduped: dict[tuple[str, str], SourceCandidate] = {}
     for candidate in candidates:
-        key = _canonical_candidate_key(candidate)
-        existing = deduped.get(key)
-        if existing is None:
-            deduped[key] = candidate
-            continue
-        prefers_youtube = candidate.source_type == "youtube" and existing.source_type != "youtube"
-        existing_is_youtube = existing.source_type == "youtube"
-        should_replace = candidate.confidence > existing.confidence and not (
-            existing_is_youtube and candidate.source_type != "youtube"
-        )
-        if prefers_youtube or should_replace:
-            deduped[key] = candidate
-    return list(deduped.values())
+        _merge_candidate(deduped, _canonical_candidate_key(candidate), candidate)
+    return deduped
 
 
 def _query_variants(query: str) -> list[str]:
@@ -152,49 +233,55 @@ def discover_with_ytdlp(query: str, max_results: int = 5) -> list[SourceCandidat
     search_expr = f"ytsearch{max_results}:{query}"
     cmd = [
         "yt-dlp",
-        "--dump-single-json",
+        "--dump-json",
+        "--flat-playlist",
         "--skip-download",
         search_expr,
     ]
     try:
-        proc = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
     except FileNotFoundError as exc:
         raise DiscoveryError("DISCOVERY_YTDLP_MISSING_BINARY", "yt-dlp binary not found in PATH") from exc
-    except subprocess.CalledProcessError as exc:
-        raise DiscoveryError("DISCOVERY_YTDLP_FAILED", f"yt-dlp discovery failed: {exc}") from exc
-
-    try:
-        payload = json.loads(proc.stdout)
-    except json.JSONDecodeError as exc:
-        raise DiscoveryError("DISCOVERY_BAD_JSON", "yt-dlp returned malformed JSON") from exc
 
-    entries = payload.get("entries") or []
+    ctx = _score_ctx(query)
     candidates: list[SourceCandidate] = []
-
-    for item in entries:
-        title = item.get("title") or "Unknown title"
-        uploader = item.get("uploader") or item.get("channel")
-        duration_sec = item.get("duration")
-        video_id = item.get("id")
-        if not video_id:
-            continue
-        url = item.get("webpage_url") or f"https://www.youtube.com/watch?v={video_id}"
-        confidence = _score(query, title, uploader, duration_sec)
-        candidates.append(
-            SourceCandidate(
-                provider="ytdlp",
-                source_type="youtube",
-                source_id=video_id,
-                title=title,
-                artist_guess=uploader,
-                duration_sec=duration_sec,
-                url=url,
-                confidence=confidence,
-                raw=item,
+    # yt-dlp prints one JSON document per search entry, so candidates are built while it is still running.
+    with proc:
+        for line in proc.stdout or ():
+            if not line.strip():
+                continue
+            try:
+                item = orjson.loads(line)
+            except orjson.JSONDecodeError as exc:
+                proc.kill()
+                raise DiscoveryError("DISCOVERY_BAD_JSON", "yt-dlp returned malformed JSON") from exc
+
+            title = item.get("title") or "Unknown title"
+            uploader = item.get("uploader") or item.get("channel")
+            duration_raw = item.get("duration")
+            duration_sec = int(duration_raw) if isinstance(duration_raw, (int, float)) else None
+            video_id = item.get("id")
+            if not video_id:
+                continue
+            url = item.get("webpage_url") or f"https://www.youtube.com/watch?v={video_id}"
+            candidates.append(
+                SourceCandidate(
+                    provider="ytdlp",
+                    source_type="youtube",
+                    source_id=video_id,
+                    title=title,
+                    artist_guess=uploader,
+                    duration_sec=duration_sec,
+                    url=url,
+                    raw=item,
+                )
             )
-        )
 
-    return sorted(candidates, key=lambda c: c.confidence, reverse=True)
+    if proc.returncode != 0:
+        raise DiscoveryError("DISCOVERY_YTDLP_FAILED", f"yt-dlp discovery failed with exit status {proc.returncode}")
+
+    _assign_confidences(ctx, candidates)
+    return heapq.nlargest(max_results, candidates, key=_BY_CONFIDENCE)
 
 
 def discover_with_youtube_api(query: str, max_results: int = 5) -> list[SourceCandidate]:
@@ -210,12 +297,13 @@ def discover_with_youtube_api(query: str, max_results: int = 5) -> list[SourceCa
         "type": "video",
         "key": api_key,
     }
-    resp = requests.get(url, params=params, timeout=20)
+    resp = SESSION.get(url, params=params, timeout=20)
     if resp.status_code != 200:
         return []
 
-    data = resp.json()
+    data = orjson.loads(resp.content)
     items = data.get("items", [])
+    ctx = _score_ctx(query)
     candidates: list[SourceCandidate] = []
 
     for item in items:
@@ -225,7 +313,6 @@ def discover_with_youtube_api(query: str, max_results: int = 5) -> list[SourceCa
         snippet = item.get("snippet") or {}
         title = snippet.get("title") or "Unknown title"
         channel = snippet.get("channelTitle")
-        confidence = _score(query, title, channel, None)
         candidates.append(
             SourceCandidate(
                 provider="youtube_api",
@@ -235,29 +322,29 @@ def discover_with_youtube_api(query: str, max_results: int = 5) -> list[SourceCa
                 artist_guess=channel,
                 duration_sec=None,
                 url=f"https://www.youtube.com/watch?v={vid}",
-                confidence=confidence,
                 raw=item,
             )
         )
 
-    return sorted(candidates, key=lambda c: c.confidence, reverse=True)
+    _assign_confidences(ctx, candidates)
+    return heapq.nlargest(max_results, candidates, key=_BY_CONFIDENCE)
 
 
 def discover_with_musicbrainz(query: str, max_results: int = 3) -> list[SourceCandidate]:
     mb_url = "https://musicbrainz.org/ws/2/recording"
     params = {"query": query, "fmt": "json", "limit": max_results}
-    headers = {"User-Agent": "openclaw-listen/0.1"}
 
     try:
-        resp = requests.get(mb_url, params=params, headers=headers, timeout=20)
+        resp = SESSION.get(mb_url, params=params, timeout=20)
     except requests.RequestException:
         return []
 
     if resp.status_code != 200:
         return []
 
-    payload = resp.json()
+    payload = orjson.loads(resp.content)
     recs = payload.get("recordings") or []
+    ctx = _score_ctx(query)
     candidates: list[SourceCandidate] = []
     for rec in recs:
         title = rec.get("title") or "Unknown title"
@@ -268,7 +355,7 @@ def discover_with_musicbrainz(query: str, max_results: int = 3) -> list[SourceCa
             artist = (first.get("artist") or {}).get("name")
         duration_ms = rec.get("length")
         duration_sec = int(duration_ms / 1000) if isinstance(duration_ms, int) else None
-        rid = rec.get("id") or re.sub(r"\s+", "-", title.lower())
+        rid = rec.get("id") or _WS_RE.sub("-", title.lower())
         candidates.append(
             SourceCandidate(
                 provider="musicbrainz",
@@ -278,21 +365,26 @@ def discover_with_musicbrainz(query: str, max_results: int = 3) -> list[SourceCa
                 artist_guess=artist,
                 duration_sec=duration_sec,
                 url=None,
-                confidence=_score(query, title, artist, duration_sec),
                 raw=rec,
             )
         )
-    return sorted(candidates, key=lambda c: c.confidence, reverse=True)
+    _assign_confidences(ctx, candidates)
+    return heapq.nlargest(max_results, candidates, key=_BY_CONFIDENCE)
 
 
-def discover_with_spotify(query: str, max_results: int = 5, settings: dict[str, Any] | None = None) -> list[SourceCandidate]:
+def discover_with_spotify(
+    query: str,
+    max_results: int = 5,
+    settings: dict[str, Any] | None = None,
+    cache: CacheStore | None = None,
+) -> list[SourceCandidate]:
     runtime_settings = settings or load_settings()
     cfg = runtime_settings.get("spotify") or {}
     if not cfg.get("enabled", True):
         return []
 
     try:
-        tracks = search_tracks(query, settings=runtime_settings, limit=max_results)
+        tracks = search_tracks(query, settings=runtime_settings, limit=max_results, cache=cache)
     except SpotifyClientError as exc:
         raise DiscoveryError(exc.code, exc.message) from exc
     except requests.RequestException as exc:
@@ -306,6 +398,7 @@ def discover_with_spotify(query: str, max_results: int = 5, settings: dict[str,
             "Spotify credentials missing; set client id/secret env vars.",
         )
 
+    ctx = _score_ctx(query)
     candidates: list[SourceCandidate] = []
     for item in tracks:
         track_id = (item.get("id") or "").strip()
@@ -318,7 +411,6 @@ def discover_with_spotify(query: str, max_results: int = 5, settings: dict[str,
         duration_ms = item.get("duration_ms")
         duration_sec = int(duration_ms / 1000) if isinstance(duration_ms, int) else None
         external_url = ((item.get("external_urls") or {}).get("spotify")) or f"https://open.spotify.com/track/{track_id}"
-        confidence = _score(query, title, artist, duration_sec)
         candidates.append(
             SourceCandidate(
                 provider="spotify",
@@ -328,12 +420,12 @@ def discover_with_spotify(query: str, max_results: int = 5, settings: dict[str,
                 artist_guess=artist,
                 duration_sec=duration_sec,
                 url=external_url,
-                confidence=confidence,
                 raw=item,
             )
         )
 
-    return sorted(candidates, key=lambda c: c.confidence, reverse=True)
+    _assign_confidences(ctx, candidates)
+    return heapq.nlargest(max_results, candidates, key=_BY_CONFIDENCE)
 
 
 def discover_with_jamendo(query: str, max_results: int = 5, settings: dict[str, Any] | None = None) -> list[SourceCandidate]:
@@ -360,18 +452,19 @@ def discover_with_jamendo(query: str, max_results: int = 5, settings: dict[str,
     }
 
     try:
-        resp = requests.get(url, params=params, timeout=timeout_sec)
+        resp = SESSION.get(url, params=params, timeout=timeout_sec)
     except requests.RequestException as exc:
         raise DiscoveryError("DISCOVERY_JAMENDO_REQUEST_FAILED", f"Jamendo request failed: {exc}") from exc
 
     if resp.status_code != 200:
         raise DiscoveryError("DISCOVERY_JAMENDO_FAILED", f"Jamendo search failed: {resp.status_code}")
 
-    payload = resp.json()
+    payload = orjson.loads(resp.content)
     rows = payload.get("results") if isinstance(payload, dict) else []
     if not isinstance(rows, list):
         return []
 
+    ctx = _score_ctx(query)
     candidates: list[SourceCandidate] = []
     for item in rows:
         if not isinstance(item, dict):
@@ -398,47 +491,87 @@ def discover_with_jamendo(query: str, max_results: int = 5, settings: dict[str,
                 artist_guess=artist,
                 duration_sec=duration_sec,
                 url=audio_url_s,
-                confidence=_score(query, title, artist, duration_sec),
                 raw=item,
             )
         )
-    return sorted(candidates, key=lambda c: c.confidence, reverse=True)
+    _assign_confidences(ctx, candidates)
+    return heapq.nlargest(max(limit, 1), candidates, key=_BY_CONFIDENCE)
+
+
+def _run_provider(
+    provider_fn: Callable[..., list[SourceCandidate]],
+    variants: list[str],
+    max_results: int,
+) -> tuple[list[SourceCandidate], DiscoveryError | None]:
+    found: list[SourceCandidate] = []
+    for query_variant in variants:
+        try:
+            found.extend(provider_fn(query_variant, max_results=max_results))
+        except DiscoveryError as exc:
+            return found, exc
+    return found, None
 
 
-def discover_song(query: str, max_results: int = 5, settings: dict[str, Any] | None = None) -> DiscoveryResult:
+def discover_song(
+    query: str,
+    max_results: int = 5,
+    settings: dict[str, Any] | None = None,
+    cache: CacheStore | None = None,
+) -> DiscoveryResult:
     trace: list[str] = []
-    all_candidates: list[SourceCandidate] = []
+    merged: dict[tuple[str, str], SourceCandidate] = {}
     runtime_settings = settings or load_settings()
-    weights = _resolve_ranking_weights(runtime_settings)
+    ctx = _score_ctx(query, _resolve_ranking_weights(runtime_settings))
 
     providers = [
         ("ytdlp", discover_with_ytdlp),
         ("youtube_api", discover_with_youtube_api),
         ("jamendo", lambda q, max_results=5: discover_with_jamendo(q, max_results=max_results, settings=runtime_settings)),
-        ("spotify", lambda q, max_results=5: discover_with_spotify(q, max_results=max_results, settings=runtime_settings)),
+        ("spotify", lambda q, max_results=5: discover_with_spotify(q, max_results=max_results, settings=runtime_settings, cache=cache)),
         ("musicbrainz", discover_with_musicbrainz),
     ]
 
-    for provider_name, provider_fn in providers:
-        provider_candidates: list[SourceCandidate] = []
-        provider_error: DiscoveryError | None = None
-        for query_variant in _query_variants(query):
-            try:
-                found = provider_fn(query_variant, max_results=max_results)
-                provider_candidates.extend(found)
-            except DiscoveryError as exc:
-                provider_error = exc
+    accept_threshold = _resolve_accept_threshold(runtime_settings)
+    variants = _query_variants(query)
+    pool = ThreadPoolExecutor(max_workers=len(providers))
+    try:
+        futures = {
+            pool.submit(_run_provider, provider_fn, variants, max_results): provider_name
+            for provider_name, provider_fn in providers
+        }
+        finished: dict[str, tuple[list[SourceCandidate], DiscoveryError | None]] = {}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                finished[futures[future]] = future.result()
+            # A retrievable candidate that already clears the threshold makes slower providers moot.
+            if accept_threshold is not None and any(
+                candidate.source_type == "youtube" and candidate.confidence >= accept_threshold
+                for future in done
+                for candidate in finished[futures[future]][0]
+            ):
                 break
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
 
+    # Merge in provider order so the trace and tie-breaking stay deterministic.
+    for provider_name, _ in providers:
+        if provider_name not in finished:
+            trace.append(f"{provider_name}:skipped")
+            continue
+        provider_candidates, provider_error = finished[provider_name]
         if provider_error is not None:
             trace.append(f"{provider_name}:error:{_trace_reason_from_error(provider_error)}")
             continue
 
-        provider_candidates = _dedupe_candidates(provider_candidates)
-        trace.append(f"{provider_name}:{len(provider_candidates)}")
-        all_candidates.extend(provider_candidates)
+        # Keys computed for the per-provider dedupe are reused for the cross-provider merge.
+        provider_deduped = _dedupe_candidates(provider_candidates)
+        trace.append(f"{provider_name}:{len(provider_deduped)}")
+        for key, candidate in provider_deduped.items():
+            _merge_candidate(merged, key, candidate)
 
-    if not all_candidates:
+    if not merged:
         hints: list[str] = []
         if any(t.startswith("ytdlp:error:missing_binary") for t in trace):
             hints.append("install yt-dlp and ensure it is on PATH")
@@ -461,10 +594,9 @@ def discover_song(query: str, max_results: int = 5, settings: dict[str, Any] | N
             f"No candidates found for query '{query}'. Provider trace: {', '.join(trace)}.{hint_text}",
         )
 
-    all_candidates = _dedupe_candidates(all_candidates)
-    for candidate in all_candidates:
-        candidate.confidence = _score(query, candidate.title, candidate.artist_guess, candidate.duration_sec, weights=weights)
+    all_candidates = list(merged.values())
+    _assign_confidences(ctx, all_candidates)
 
-    all_candidates.sort(key=lambda c: c.confidence, reverse=True)
+    all_candidates.sort(key=_BY_CONFIDENCE, reverse=True)
     selected = all_candidates[0]
     return DiscoveryResult(query=query, candidates=all_candidates, selected=selected, provider_trace=trace)
@@ -7,6 +7,10 @@ class MusicListenError(Exception):
         self.code = code
         self.message = message
 
+    def __reduce__(self):
+        # Keeps errors raised in worker processes picklable with both constructor arguments.
+        return (self.__class__, (self.code, self.message))
+
 
 class DiscoveryError(MusicListenError):
     pass
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+USER_AGENT = "openclaw-listen/0.1"
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    # Only connection failures are retried; read retries would multiply provider timeouts.
+    retry = Retry(total=2, read=0, backoff_factor=0.2)
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+SESSION = _build_session()
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import json
 import re
 from collections import Counter
 from typing import Literal
@@ -8,80 +7,103 @@ from typing import Literal
 from .cache import CacheStore
 from .models import LyricsAnalysisResult, LyricsArtifact
 
-THEME_KEYWORDS: dict[str, set[str]] = {
-    "love": {"love", "heart", "kiss", "romance", "darling"},
-    "loss": {"gone", "leave", "lost", "grief", "empty", "alone"},
-    "hope": {"rise", "light", "tomorrow", "heal", "hold on"},
-    "pain": {"hurt", "bleed", "broken", "cry", "wound"},
-    "freedom": {"free", "escape", "wings", "open road", "fly"},
-    "identity": {"who am i", "myself", "name", "mirror", "be me"},
+THEME_KEYWORDS: dict[str, frozenset[str]] = {
+    "love": frozenset({"love", "heart", "kiss", "romance", "darling"}),
+    "loss": frozenset({"gone", "leave", "lost", "grief", "empty", "alone"}),
+    "hope": frozenset({"rise", "light", "tomorrow", "heal", "hold on"}),
+    "pain": frozenset({"hurt", "bleed", "broken", "cry", "wound"}),
+    "freedom": frozenset({"free", "escape", "wings", "open road", "fly"}),
+    "identity": frozenset({"who am i", "myself", "name", "mirror", "be me"}),
 }
 
-POSITIVE_WORDS = {
-    "love",
-    "hope",
-    "alive",
-    "shine",
-    "joy",
-    "dream",
-    "heal",
-    "peace",
-    "smile",
-}
-NEGATIVE_WORDS = {
-    "pain",
-    "hurt",
-    "lost",
-    "alone",
-    "dark",
-    "broken",
-    "cry",
-    "fear",
-    "empty",
-}
+POSITIVE_WORDS = frozenset(
+    {
+        "love",
+        "hope",
+        "alive",
+        "shine",
+        "joy",
+        "dream",
+        "heal",
+        "peace",
+        "smile",
+    }
+)
+NEGATIVE_WORDS = frozenset(
+    {
+        "pain",
+        "hurt",
+        "lost",
+        "alone",
+        "dark",
+        "broken",
+        "cry",
+        "fear",
+        "empty",
+    }
+)
+
+_IS_POSITIVE = POSITIVE_WORDS.__contains__
+_IS_NEGATIVE = NEGATIVE_WORDS.__contains__
+
+_TOKEN_RE = re.compile(r"[a-zA-Z']+")
+
+# A zero-width lookahead reports every keyword start, so overlapping keywords are not
+# swallowed by an earlier match and one scan finds the same themes as per-keyword `in` checks.
+_THEME_RE = re.compile(
+    "(?=(?:"
+    + "|".join(
+        f"(?P<{theme}>{'|'.join(re.escape(k) for k in sorted(keys, key=len, reverse=True))})"
+        for theme, keys in THEME_KEYWORDS.items()
+    )
+    + "))"
+)
 
 
 def _tokenize(text: str) -> list[str]:
-    return re.findall(r"[a-zA-Z']+", text.lower())
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _tokenize_lines(text: str) -> list[tuple[str, list[str]]]:
+    lines: list[tuple[str, list[str]]] = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped:
+            lines.append((stripped, _tokenize(stripped)))
+    return lines
 
 
-def _extract_themes(text: str) -> list[str]:
-    text_l = text.lower()
-    hits: list[str] = []
-    for theme, keys in THEME_KEYWORDS.items():
-        if any(k in text_l for k in keys):
-            hits.append(theme)
+def _extract_themes(text: str, tokens: list[str] | None = None) -> list[str]:
+    found = {match.lastgroup for match in _THEME_RE.finditer(text.lower())}
+    hits = [theme for theme in THEME_KEYWORDS if theme in found]
     if hits:
         return hits[:3]
-    counts = Counter(_tokenize(text))
+    counts = Counter(_tokenize(text) if tokens is None else tokens)
     fallback = [word for word, _ in counts.most_common(3) if len(word) > 4]
     return fallback or ["reflection"]
 
 
-def _pick_evidence_lines(text: str, limit: int = 3) -> list[str]:
-    raw_lines = [line.strip() for line in text.splitlines() if line.strip()]
-    if not raw_lines:
+def _pick_evidence_lines(lines: list[tuple[str, list[str]]], limit: int = 3) -> list[str]:
+    if not lines:
         return []
     scored: list[tuple[int, str]] = []
-    for line in raw_lines:
-        tokens = _tokenize(line)
+    for line, tokens in lines:
         if len(tokens) < 3:
             continue
-        pos = sum(1 for t in tokens if t in POSITIVE_WORDS)
-        neg = sum(1 for t in tokens if t in NEGATIVE_WORDS)
+        pos = sum(map(_IS_POSITIVE, tokens))
+        neg = sum(map(_IS_NEGATIVE, tokens))
         scored.append((pos + neg, line[:160]))
     if not scored:
-        return raw_lines[:limit]
+        return [line for line, _ in lines[:limit]]
     scored.sort(key=lambda x: x[0], reverse=True)
     return [line for _, line in scored[:limit]]
 
 
-def _polarity_intensity(text: str) -> tuple[Literal["negative", "mixed", "positive", "neutral"], float]:
-    tokens = _tokenize(text)
+def _polarity_intensity(tokens: list[str]) -> tuple[Literal["negative", "mixed", "positive", "neutral"], float]:
     if not tokens:
         return "neutral", 0.0
-    pos = sum(1 for t in tokens if t in POSITIVE_WORDS)
-    neg = sum(1 for t in tokens if t in NEGATIVE_WORDS)
+    pos = sum(map(_IS_POSITIVE, tokens))
+    neg = sum(map(_IS_NEGATIVE, tokens))
     total = max(1, pos + neg)
     intensity = min(1.0, total / max(12.0, len(tokens) / 8.0))
     if pos == 0 and neg == 0:
@@ -102,9 +124,12 @@ def analyze_lyrics(lyrics: LyricsArtifact, cache: CacheStore | None = None) -> L
         if cached:
             return LyricsAnalysisResult.model_validate_json(cached)
 
-    themes = _extract_themes(lyrics.text)
-    polarity, intensity = _polarity_intensity(lyrics.text)
-    evidence = _pick_evidence_lines(lyrics.text, limit=3)
+    # Tokens never span a line break, so per-line tokens concatenate to the full-text tokens.
+    lines = _tokenize_lines(lyrics.text)
+    tokens = [token for _, line_tokens in lines for token in line_tokens]
+    themes = _extract_themes(lyrics.text, tokens)
+    polarity, intensity = _polarity_intensity(tokens)
+    evidence = _pick_evidence_lines(lines, limit=3)
 
     length_factor = min(1.0, len(lyrics.text) / 1200.0)
     signal_factor = 0.75 if polarity in {"neutral", "mixed"} else 0.9
@@ -124,5 +149,5 @@ def analyze_lyrics(lyrics: LyricsArtifact, cache: CacheStore | None = None) -> L
     )
 
     if cache and lyrics_key:
-        cache.put_lyrics_analysis(lyrics_key, json.dumps(result.model_dump()))
+        cache.put_lyrics_analysis(lyrics_key, result.model_dump_json())
     return result
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import json
-from difflib import SequenceMatcher
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from rapidfuzz import fuzz
 
 from .cache import CacheStore
+from .http import SESSION
 from .models import AudioArtifact, LyricsArtifact, SourceCandidate
 
 
@@ -19,10 +20,10 @@ def _candidate_score(
     artist: str | None,
     duration_sec: int | float | None,
 ) -> float:
-    title_score = SequenceMatcher(None, _norm(source.title), _norm(title)).ratio()
+    title_score = fuzz.ratio(_norm(source.title), _norm(title)) / 100.0
     artist_score = 0.0
     if source.artist_guess and artist:
-        artist_score = SequenceMatcher(None, _norm(source.artist_guess), _norm(artist)).ratio()
+        artist_score = fuzz.ratio(_norm(source.artist_guess), _norm(artist)) / 100.0
 
     duration_score = 0.5
     if source.duration_sec and duration_sec:
@@ -53,7 +54,7 @@ def _fetch_from_lrclib(source: SourceCandidate, timeout_sec: int) -> LyricsArtif
 
     for params in params_list:
         try:
-            resp = requests.get(search_url, params=params, timeout=timeout_sec)
+            resp = SESSION.get(search_url, params=params, timeout=timeout_sec)
         except requests.RequestException:
             continue
         if resp.status_code != 200:
@@ -120,6 +121,10 @@ def _transcribe_audio_for_lyrics(audio: AudioArtifact, model_size: str = "small"
     )
 
 
+def _lyrics_key(cache: CacheStore, source: SourceCandidate) -> str:
+    return cache.normalize_key(f"{source.provider}:{source.source_id}:lyrics")
+
+
 def fetch_lyrics(
     source: SourceCandidate,
     cache: CacheStore,
@@ -130,8 +135,9 @@ def fetch_lyrics(
     if not cfg.get("enabled", True):
         return LyricsArtifact(source="none", warnings=["LYRICS_DISABLED"])
 
-    source_key = cache.normalize_key(f"{source.provider}:{source.source_id}:lyrics")
-    if cfg.get("include_in_cache", True):
+    use_cache = cfg.get("include_in_cache", True)
+    source_key = _lyrics_key(cache, source)
+    if use_cache:
         cached_payload = cache.get_lyrics(source_key)
         if cached_payload:
             return LyricsArtifact.model_validate_json(cached_payload)
@@ -154,6 +160,32 @@ def fetch_lyrics(
         if lyrics.text and len(lyrics.text) < min_chars:
             lyrics = LyricsArtifact(source="none", warnings=["LYRICS_TOO_SHORT"])
 
-    if cfg.get("include_in_cache", True):
-        cache.put_lyrics(source_key, json.dumps(lyrics.model_dump()))
+    if use_cache:
+        cache.put_lyrics(source_key, lyrics.model_dump_json())
     return lyrics
+
+
+def fetch_lyrics_many(
+    sources: list[SourceCandidate],
+    cache: CacheStore,
+    settings: dict,
+    max_workers: int = 8,
+) -> list[LyricsArtifact]:
+    cfg = settings.get("lyrics") or {}
+    results: list[LyricsArtifact | None] = [None] * len(sources)
+    if cfg.get("enabled", True) and cfg.get("include_in_cache", True):
+        keys = [_lyrics_key(cache, source) for source in sources]
+        cached = cache.get_lyrics_many(keys)
+        for idx, key in enumerate(keys):
+            payload = cached.get(key)
+            if payload:
+                results[idx] = LyricsArtifact.model_validate_json(payload)
+
+    # LRCLIB has no batch endpoint, so the remaining lookups fan out over the pooled session.
+    missing = [idx for idx, lyrics in enumerate(results) if lyrics is None]
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing)))) as pool:
+            fetched = pool.map(lambda idx: fetch_lyrics(sources[idx], cache=cache, settings=settings), missing)
+            for idx, lyrics in zip(missing, fetched):
+                results[idx] = lyrics
+    return results  # type: ignore[return-value]
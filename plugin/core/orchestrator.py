@@ -1,7 +1,13 @@
 from __future__ import annotations
 
 import json
-from typing import Literal
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Literal
+
+import orjson
 
 from .analysis import analyze_audio
 from .cache import CacheStore
@@ -10,62 +16,83 @@ from .discovery import discover_song
 from .errors import AnalysisError, DiscoveryError, RetrievalError
 from .lyric_analysis import analyze_lyrics
 from .lyrics import fetch_lyrics
-from .models import DescriptorArtifact, DiscoveryResult, ListenResult, MetadataArtifact, SourceCandidate
+from .models import (
+    DescriptorArtifact,
+    DiscoveryResult,
+    ListenResult,
+    LyricsArtifact,
+    MetadataArtifact,
+    SourceCandidate,
+)
 from .retrieval import fetch_audio
 from .settings import load_settings
 from .synthesis import build_descriptor_synthesis, build_metadata_synthesis, build_synthesis
 
+# Bounds concurrent yt-dlp/Jamendo downloads when several listens run at once.
+_FETCH_SLOTS = threading.BoundedSemaphore(4)
+_LYRICS_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="listen-lyrics")
+
+_ALLOWED_MODES = frozenset({"auto", "full_audio", "metadata_only", "descriptor_only"})
+_FULL_AUDIO_MODES = frozenset({"auto", "full_audio"})
+_DESCRIPTOR_MODES = frozenset({"descriptor_only", "metadata_only", "auto"})
+
+
+# CacheStore keeps recent payload strings in memory and still applies the TTL, so parsed
+# results are memoized per payload; the str hash is cached on the object after the first call.
+# Callers get a deep copy so a mutated result never leaks into later cache hits.
+@lru_cache(maxsize=256)
+def _parse_discovery(payload: str) -> DiscoveryResult:
+    # pydantic-core's JSON validator beats orjson + model_construct, which runs in Python.
+    return DiscoveryResult.model_validate_json(payload)
 
-def discover(query: str, cache: CacheStore, ttl_sec: int = 604800) -> DiscoveryResult:
+
+# Failed lookups are cached briefly in kv_cache, not query_cache, so retries skip the provider
+# fan-out without cache_status reporting the query as cached.
+def _negative_key(query: str) -> str:
+    return f"discover:not_found:{query}"
+
+
+def discover(query: str, cache: CacheStore, ttl_sec: int = 604800, negative_ttl_sec: int = 300) -> DiscoveryResult:
     cached_payload = cache.get_query(query, ttl_sec=ttl_sec)
     if cached_payload:
-        return DiscoveryResult.model_validate_json(cached_payload)
+        return _parse_discovery(cached_payload).model_copy(deep=True)
+    negative = cache.get_kv(_negative_key(query))
+    if negative:
+        failure = orjson.loads(negative[0])
+        if int(time.time()) - failure["at"] <= negative_ttl_sec:
+            raise DiscoveryError(failure["code"], failure["message"])
 
     settings = load_settings()
-    result = discover_song(query, settings=settings)
+    try:
+        result = discover_song(query, settings=settings, cache=cache)
+    except DiscoveryError as exc:
+        if exc.code == "DISCOVERY_NOT_FOUND":
+            now = int(time.time())
+            failure = {"code": exc.code, "message": exc.message, "at": now}
+            cache.put_kv(_negative_key(query), orjson.dumps(failure).decode(), now + negative_ttl_sec)
+        raise
     cache.put_query(query, result.model_dump_json())
     return result
 
 
 def _resolve_mode(mode: str | None, settings: dict) -> Literal["auto", "full_audio", "metadata_only", "descriptor_only"]:
-    allowed = {"auto", "full_audio", "metadata_only", "descriptor_only"}
-    if mode in allowed:
+    if mode in _ALLOWED_MODES:
         return mode  # type: ignore[return-value]
     configured = ((settings.get("listen") or {}).get("default_mode")) or "auto"
-    if configured in allowed:
+    if configured in _ALLOWED_MODES:
         return configured  # type: ignore[return-value]
     return "auto"
 
 
-def _metadata_from_source(source: SourceCandidate) -> MetadataArtifact:
-    raw = source.raw or {}
-    artists: list[str] = []
-    album = None
-    release_date = None
-    isrc = None
-    popularity = None
-    metadata_source: Literal["spotify", "musicbrainz", "youtube", "unknown"] = "unknown"
-
-    if source.provider == "spotify":
-        metadata_source = "spotify"
-        artists = [a.get("name") for a in raw.get("artists", []) if isinstance(a, dict) and a.get("name")]
-        album = ((raw.get("album") or {}).get("name")) if isinstance(raw.get("album"), dict) else None
-        release_date = (
-            (raw.get("album") or {}).get("release_date")
-            if isinstance(raw.get("album"), dict)
-            else None
-        )
-        isrc = ((raw.get("external_ids") or {}).get("isrc")) if isinstance(raw.get("external_ids"), dict) else None
-        popularity = raw.get("popularity") if isinstance(raw.get("popularity"), int) else None
-    elif source.provider == "musicbrainz":
-        metadata_source = "musicbrainz"
-        if source.artist_guess:
-            artists = [source.artist_guess]
-    elif source.provider in {"ytdlp", "youtube_api"}:
-        metadata_source = "youtube"
-        if source.artist_guess:
-            artists = [source.artist_guess]
-
+def _metadata_artifact(
+    source: SourceCandidate,
+    metadata_source: Literal["spotify", "musicbrainz", "youtube", "unknown"],
+    artists: list[str],
+    album: str | None = None,
+    release_date: str | None = None,
+    isrc: str | None = None,
+    popularity: int | None = None,
+) -> MetadataArtifact:
     return MetadataArtifact(
         source=metadata_source,
         track_id=source.source_id,
@@ -80,24 +107,55 @@ def _metadata_from_source(source: SourceCandidate) -> MetadataArtifact:
     )
 
 
-def _is_retrievable_source(source: SourceCandidate) -> bool:
-    return source.source_type == "youtube" and bool(source.url)
+def _spotify_metadata(source: SourceCandidate) -> MetadataArtifact:
+    raw = source.raw or {}
+    album = raw.get("album")
+    if not isinstance(album, dict):
+        album = {}
+    external_ids = raw.get("external_ids")
+    popularity = raw.get("popularity")
+    return _metadata_artifact(
+        source,
+        "spotify",
+        artists=[a["name"] for a in raw.get("artists") or [] if isinstance(a, dict) and a.get("name")],
+        album=album.get("name"),
+        release_date=album.get("release_date"),
+        isrc=external_ids.get("isrc") if isinstance(external_ids, dict) else None,
+        popularity=popularity if isinstance(popularity, int) else None,
+    )
+
+
+def _musicbrainz_metadata(source: SourceCandidate) -> MetadataArtifact:
+    return _metadata_artifact(source, "musicbrainz", artists=[source.artist_guess] if source.artist_guess else [])
+
+
+def _youtube_metadata(source: SourceCandidate) -> MetadataArtifact:
+    return _metadata_artifact(source, "youtube", artists=[source.artist_guess] if source.artist_guess else [])
+
+
+def _unknown_metadata(source: SourceCandidate) -> MetadataArtifact:
+    return _metadata_artifact(source, "unknown", artists=[])
+
+
+_METADATA_BUILDERS: dict[str, Callable[[SourceCandidate], MetadataArtifact]] = {
+    "spotify": _spotify_metadata,
+    "musicbrainz": _musicbrainz_metadata,
+    "ytdlp": _youtube_metadata,
+    "youtube_api": _youtube_metadata,
+}
+
+
+def _metadata_from_source(source: SourceCandidate) -> MetadataArtifact:
+    return _METADATA_BUILDERS.get(source.provider, _unknown_metadata)(source)
 
 
-def _audio_provider_priority(provider: str) -> int:
-    if provider == "ytdlp":
-        return 0
-    if provider == "youtube_api":
-        return 1
-    if provider == "jamendo":
-        return 2
-    return 3
+_AUDIO_PROVIDER_PRIORITY = {"ytdlp": 0, "youtube_api": 1, "jamendo": 2}
 
 
 def _audio_candidates_for_retry(discovery: DiscoveryResult) -> list[SourceCandidate]:
     pool = discovery.candidates or ([discovery.selected] if discovery.selected else [])
-    retrievable = [candidate for candidate in pool if _is_retrievable_source(candidate)]
-    retrievable.sort(key=lambda c: (_audio_provider_priority(c.provider), -c.confidence))
+    retrievable = [c for c in pool if c.source_type == "youtube" and c.url]
+    retrievable.sort(key=lambda c: (_AUDIO_PROVIDER_PRIORITY.get(c.provider, 3), -c.confidence))
 
     seen: set[tuple[str, str]] = set()
     unique: list[SourceCandidate] = []
@@ -110,41 +168,46 @@ def _audio_candidates_for_retry(discovery: DiscoveryResult) -> list[SourceCandid
     return unique
 
 
+_YTDLP_ERROR_PREFIX = "ytdlp:error:"
+
+
 def _primary_ytdlp_failure_marker(provider_trace: list[str]) -> str | None:
     for item in provider_trace:
-        if item.startswith("ytdlp:error:"):
-            reason = item.split(":", 2)[2] or "error"
+        if item.startswith(_YTDLP_ERROR_PREFIX):
+            reason = item[len(_YTDLP_ERROR_PREFIX) :] or "error"
             return f"primary:ytdlp_failed({reason})"
     return None
 
 
 def listen(query: str, cache: CacheStore, deep_analysis: bool = True, mode: str | None = None) -> ListenResult:
     outcome = ListenResult(query=query)
+    trace_append = outcome.fallback_trace.append
+    errors_append = outcome.errors.append
     settings = load_settings()
     runtime_mode = _resolve_mode(mode, settings)
 
     try:
         d = discover(query, cache)
     except DiscoveryError as exc:
-        outcome.errors.append({"code": exc.code, "message": exc.message})
+        errors_append({"code": exc.code, "message": exc.message})
         return outcome
 
     outcome.fallback_trace.extend(d.provider_trace)
     ytdlp_failure = _primary_ytdlp_failure_marker(d.provider_trace)
     if ytdlp_failure:
-        outcome.fallback_trace.append(ytdlp_failure)
+        trace_append(ytdlp_failure)
     if not d.selected:
-        outcome.errors.append({"code": "DISCOVERY_EMPTY_SELECTION", "message": "No selected candidate"})
+        errors_append({"code": "DISCOVERY_EMPTY_SELECTION", "message": "No selected candidate"})
         return outcome
 
-    should_try_full_audio = runtime_mode in {"auto", "full_audio"}
+    should_try_full_audio = runtime_mode in _FULL_AUDIO_MODES
     audio_candidates: list[SourceCandidate] = []
     chosen_source = d.selected
     if should_try_full_audio:
         audio_candidates = _audio_candidates_for_retry(d)
         if audio_candidates:
             chosen_source = audio_candidates[0]
-            outcome.fallback_trace.append(f"audio_source:selected({chosen_source.provider}:{chosen_source.source_id})")
+            trace_append(f"audio_source:selected({chosen_source.provider}:{chosen_source.source_id})")
         else:
             chosen_source = d.selected
 
@@ -153,10 +216,11 @@ def listen(query: str, cache: CacheStore, deep_analysis: bool = True, mode: str
 
     full_audio_ready = False
     audio_retrieved = False
+    lyrics_future: Future[LyricsArtifact] | None = None
     if should_try_full_audio:
         if not audio_candidates:
             if runtime_mode == "full_audio":
-                outcome.errors.append(
+                errors_append(
                     {
                         "code": "RETRIEVAL_UNAVAILABLE",
                         "message": "No retrievable candidates found for full_audio mode",
@@ -164,21 +228,22 @@ def listen(query: str, cache: CacheStore, deep_analysis: bool = True, mode: str
                 )
                 outcome.analysis_mode = "failed"
                 return outcome
-            outcome.fallback_trace.append("mode:auto->metadata_only(no_retrievable_source)")
+            trace_append("mode:auto->metadata_only(no_retrievable_source)")
         else:
             retrieval_error: RetrievalError | None = None
             for idx, candidate in enumerate(audio_candidates):
+                # The first candidate is chosen_source, whose metadata was built above.
                 if idx > 0:
                     prev = audio_candidates[idx - 1]
-                    outcome.fallback_trace.append(f"audio_source:retry({prev.provider}->{candidate.provider})")
-
-                outcome.source = candidate
-                outcome.metadata = _metadata_from_source(candidate)
+                    trace_append(f"audio_source:retry({prev.provider}->{candidate.provider})")
+                    outcome.source = candidate
+                    outcome.metadata = _metadata_from_source(candidate)
                 try:
-                    fetched = fetch_audio(candidate, cache)
+                    with _FETCH_SLOTS:
+                        fetched = fetch_audio(candidate, cache)
                 except RetrievalError as exc:
                     retrieval_error = exc
-                    outcome.errors.append({"code": exc.code, "message": exc.message})
+                    errors_append({"code": exc.code, "message": exc.message})
                     continue
 
                 outcome.audio = fetched.audio
@@ -191,38 +256,47 @@ def listen(query: str, cache: CacheStore, deep_analysis: bool = True, mode: str
                 if runtime_mode == "full_audio":
                     outcome.analysis_mode = "failed"
                     return outcome
-                outcome.fallback_trace.append("mode:auto->metadata_only(retrieval_failed_all_candidates)")
+                trace_append("mode:auto->metadata_only(retrieval_failed_all_candidates)")
             elif outcome.audio:
                 chosen_source = outcome.source
 
         if audio_retrieved and outcome.audio:
+            # Lyrics only need the final source and audio path, so the network-bound fetch
+            # overlaps with CPU-bound feature extraction.
+            lyrics_future = _LYRICS_POOL.submit(
+                fetch_lyrics, outcome.source, cache=cache, settings=settings, audio=outcome.audio
+            )
             try:
                 feature = analyze_audio(outcome.audio.path, cache)
                 outcome.features = feature
                 outcome.cache["feature_cache_key"] = cache.normalize_key(outcome.audio.path)
                 full_audio_ready = True
             except AnalysisError as exc:
-                outcome.errors.append({"code": exc.code, "message": exc.message})
+                errors_append({"code": exc.code, "message": exc.message})
                 if runtime_mode == "full_audio":
+                    lyrics_future.cancel()
                     outcome.analysis_mode = "failed"
                     return outcome
-                outcome.fallback_trace.append("mode:auto->metadata_only(analysis_failed)")
+                trace_append("mode:auto->metadata_only(analysis_failed)")
 
     if outcome.source:
-        lyrics = fetch_lyrics(outcome.source, cache=cache, settings=settings, audio=outcome.audio)
+        if lyrics_future is not None:
+            lyrics = lyrics_future.result()
+        else:
+            lyrics = fetch_lyrics(outcome.source, cache=cache, settings=settings, audio=outcome.audio)
         outcome.lyrics = lyrics
         if lyrics.text:
             outcome.lyrics_analysis = analyze_lyrics(lyrics, cache=cache)
 
     descriptor: DescriptorArtifact | None = None
-    should_build_descriptor = runtime_mode in {"descriptor_only", "metadata_only", "auto"} and not full_audio_ready
+    should_build_descriptor = runtime_mode in _DESCRIPTOR_MODES and not full_audio_ready
     if should_build_descriptor and outcome.source:
-        descriptor = build_descriptor_artifact(outcome.source, outcome.metadata, settings=settings)
+        descriptor = build_descriptor_artifact(outcome.source, outcome.metadata, settings=settings, cache=cache)
         outcome.descriptor = descriptor
         if descriptor and descriptor.confidence > 0.0:
-            outcome.fallback_trace.append("descriptor:resolved")
+            trace_append("descriptor:resolved")
         elif runtime_mode == "descriptor_only":
-            outcome.fallback_trace.append("descriptor:unavailable")
+            trace_append("descriptor:unavailable")
 
     if full_audio_ready:
         outcome.analysis_mode = "full_audio"
@@ -253,5 +327,19 @@ def listen(query: str, cache: CacheStore, deep_analysis: bool = True, mode: str
     return outcome
 
 
+def listen_batch(
+    queries: list[str],
+    cache: CacheStore,
+    deep_analysis: bool = True,
+    mode: str | None = None,
+    max_workers: int = 8,
+) -> list[ListenResult]:
+    if not queries:
+        return []
+    # Stages are dominated by HTTP and yt-dlp latency, so per-query pipelines overlap in threads.
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(queries)))) as pool:
+        return list(pool.map(lambda q: listen(q, cache, deep_analysis=deep_analysis, mode=mode), queries))
+
+
 def cache_status(cache: CacheStore, key: str) -> str:
     return json.dumps(cache.cache_status(key), indent=2)
@@ -1,24 +1,107 @@
 from __future__ import annotations
 
-import subprocess
-from urllib.parse import urlparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from types import ModuleType
 
 import requests
 
 from .cache import CacheStore
 from .errors import RetrievalError
+from .http import SESSION
 from .models import AudioArtifact, FetchResult, SourceCandidate
 
+_CHUNK_BYTES = 1024 * 1024
+_RANGE_PROBE_BYTES = 512 * 1024
+_RANGE_PARTS = 4
+
+
+# yt_dlp takes ~150ms to import, so it is loaded on the first download rather than at startup.
+@lru_cache(maxsize=1)
+def _load_yt_dlp() -> ModuleType | None:
+    try:
+        import yt_dlp
+    except ImportError:
+        return None
+    return yt_dlp
+
 
 def _ext_from_url(url: str) -> str:
-    parsed = urlparse(url)
-    ext = Path(parsed.path).suffix.lstrip(".").lower()
-    if ext:
-        return ext
+    path = url.split("?", 1)[0].split("#", 1)[0]
+    if "//" in path:
+        path = path.split("//", 1)[1].partition("/")[2]
+    name = path.rstrip("/").rpartition("/")[2].split(";", 1)[0]
+    dot = name.rfind(".")
+    if 0 < dot < len(name) - 1:
+        return name[dot + 1 :].lower()
     return "mp3"
 
 
+def _content_range_total(resp: requests.Response) -> int | None:
+    if resp.status_code != 206:
+        return None
+    _, _, total = resp.headers.get("Content-Range", "").partition("/")
+    return int(total) if total.isdigit() else None
+
+
+def _preallocate(fd: int, size: int) -> None:
+    if size <= 0:
+        return
+    # Reserving the extents up front avoids growing the file block by block; ftruncate at least
+    # sizes it so the range workers can write at their offsets.
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return
+        except OSError:
+            pass
+    os.ftruncate(fd, size)
+
+
+def _fetch_range(url: str, target: Path, first: int, last: int, timeout_sec: int) -> None:
+    resp = SESSION.get(url, headers={"Range": f"bytes={first}-{last}"}, timeout=timeout_sec, stream=True)
+    resp.raise_for_status()
+    if resp.status_code != 206:
+        raise RetrievalError("RETRIEVAL_JAMENDO_HTTP_FAILED", "Jamendo ignored a ranged request mid-download")
+    with target.open("r+b") as fh:
+        fh.seek(first)
+        for chunk in resp.iter_content(chunk_size=_CHUNK_BYTES):
+            fh.write(chunk)
+
+
+def _download_jamendo(url: str, target: Path, timeout_sec: int) -> None:
+    try:
+        _download_jamendo_ranges(url, target, timeout_sec)
+    except Exception:
+        # A failed probe or range leaves a preallocated file of the full size behind.
+        target.unlink(missing_ok=True)
+        raise
+
+
+def _download_jamendo_ranges(url: str, target: Path, timeout_sec: int) -> None:
+    # The first request doubles as the range probe: a 206 reports the full size, so the
+    # rest of the file is split into parallel ranges; a plain 200 is streamed as before.
+    resp = SESSION.get(url, headers={"Range": f"bytes=0-{_RANGE_PROBE_BYTES - 1}"}, timeout=timeout_sec, stream=True)
+    resp.raise_for_status()
+    total = _content_range_total(resp)
+    with target.open("wb") as fh:
+        _preallocate(fh.fileno(), total if total is not None else int(resp.headers.get("Content-Length") or 0))
+        for chunk in resp.iter_content(chunk_size=_CHUNK_BYTES):
+            fh.write(chunk)
+        start = fh.tell()
+        if total is None or total <= start:
+            fh.truncate()
+            return
+
+    step = -(-(total - start) // _RANGE_PARTS)
+    ranges = [(first, min(first + step, total) - 1) for first in range(start, total, step)]
+    with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+        list(pool.map(lambda bounds: _fetch_range(url, target, bounds[0], bounds[1], timeout_sec), ranges))
+
+
 def fetch_audio(
     source: SourceCandidate,
     cache: CacheStore,
@@ -42,17 +125,11 @@ def fetch_audio(
         ext = _ext_from_url(source.url)
         target = Path(cache.audio_dir) / f"{source_key}.{ext}"
         try:
-            resp = requests.get(source.url, timeout=timeout_sec, stream=True)
-            resp.raise_for_status()
+            _download_jamendo(source.url, target, timeout_sec)
         except requests.Timeout as exc:
             raise RetrievalError("RETRIEVAL_JAMENDO_TIMEOUT", f"Jamendo download timed out after {timeout_sec}s") from exc
         except requests.RequestException as exc:
             raise RetrievalError("RETRIEVAL_JAMENDO_HTTP_FAILED", f"Jamendo download failed: {exc}") from exc
-
-        with target.open("wb") as fh:
-            for chunk in resp.iter_content(chunk_size=64 * 1024):
-                if chunk:
-                    fh.write(chunk)
         if not target.exists() or target.stat().st_size == 0:
             raise RetrievalError("RETRIEVAL_JAMENDO_EMPTY", "Jamendo returned no audio content")
 
@@ -63,38 +140,76 @@ def fetch_audio(
             cache_hit=False,
         )
 
-    out_tpl = str(cache.audio_dir / f"{source_key}.%(ext)s")
-    cmd = [
-        "yt-dlp",
-        "-x",
-        "--audio-format",
-        output_format,
-        "--audio-quality",
-        "0",
-        "-o",
-        out_tpl,
-        source.url,
-    ]
+    yt_dlp = _load_yt_dlp()
+    if yt_dlp is None:
+        raise RetrievalError("RETRIEVAL_YTDLP_MISSING", "yt-dlp is not installed")
+
+    deadline = time.monotonic() + timeout_sec
 
+    # ffmpeg cannot be interrupted mid-conversion, so the deadline is enforced per progress
+    # tick while downloading and at each postprocessor's start and finish.
+    def _check_deadline(_status: dict) -> None:
+        if time.monotonic() > deadline:
+            raise yt_dlp.utils.DownloadCancelled("retrieval deadline exceeded")
+
+    opts = {
+        "format": "bestaudio/best",
+        "outtmpl": str(cache.audio_dir / f"{source_key}.%(ext)s"),
+        "postprocessors": [
+            {"key": "FFmpegExtractAudio", "preferredcodec": output_format, "preferredquality": "0"},
+        ],
+        "socket_timeout": timeout_sec,
+        "progress_hooks": [_check_deadline],
+        "postprocessor_hooks": [_check_deadline],
+        "quiet": True,
+        "no_warnings": True,
+        "noprogress": True,
+        "updatetime": False,
+    }
     try:
-        subprocess.run(cmd, check=True, timeout=timeout_sec, capture_output=True, text=True)
-    except FileNotFoundError as exc:
-        raise RetrievalError("RETRIEVAL_YTDLP_MISSING", "yt-dlp is not installed") from exc
-    except subprocess.TimeoutExpired as exc:
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            ydl.download([source.url])
+    except yt_dlp.utils.DownloadCancelled as exc:
         raise RetrievalError("RETRIEVAL_TIMEOUT", f"Audio retrieval timed out after {timeout_sec}s") from exc
-    except subprocess.CalledProcessError as exc:
-        stderr = (exc.stderr or "").strip()
-        raise RetrievalError("RETRIEVAL_YTDLP_FAILED", f"yt-dlp failed: {stderr}") from exc
-
-    produced = list(Path(cache.audio_dir).glob(f"{source_key}.*"))
-    if not produced:
-        raise RetrievalError("RETRIEVAL_NOT_FOUND", "yt-dlp completed but no audio artifact was produced")
+    except yt_dlp.utils.DownloadError as exc:
+        raise RetrievalError("RETRIEVAL_YTDLP_FAILED", f"yt-dlp failed: {exc}") from exc
 
-    audio_path = str(produced[0])
-    fmt = produced[0].suffix.lstrip(".") or output_format
+    # FFmpegExtractAudio names the output after the requested codec; the glob only covers renames.
+    expected = Path(cache.audio_dir) / f"{source_key}.{output_format}"
+    if expected.exists():
+        audio_path, fmt = str(expected), output_format
+    else:
+        prefix = f"{source_key}."
+        with os.scandir(cache.audio_dir) as entries:
+            hit = next((entry for entry in entries if entry.name.startswith(prefix)), None)
+        if hit is None:
+            raise RetrievalError("RETRIEVAL_NOT_FOUND", "yt-dlp completed but no audio artifact was produced")
+        audio_path, fmt = hit.path, hit.name.rsplit(".", 1)[1] or output_format
     cache.put_audio(source_key, audio_path, fmt)
     return FetchResult(
         source=source,
         audio=AudioArtifact(path=audio_path, format=fmt),
         cache_hit=False,
     )
+
+
+def fetch_audio_batch(
+    sources: list[SourceCandidate],
+    cache: CacheStore,
+    output_format: str = "wav",
+    timeout_sec: int = 120,
+    max_workers: int = 8,
+) -> list[FetchResult | RetrievalError]:
+    if not sources:
+        return []
+
+    # One dead URL must not discard the rest of the batch, so failures are returned in place.
+    def _fetch(source: SourceCandidate) -> FetchResult | RetrievalError:
+        try:
+            return fetch_audio(source, cache, output_format=output_format, timeout_sec=timeout_sec)
+        except RetrievalError as exc:
+            return exc
+
+    # Downloads are network-bound, so a small thread pool overlaps them without an event loop.
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(sources)))) as pool:
+        return list(pool.map(_fetch, sources))
@@ -1,17 +1,31 @@
 from __future__ import annotations
 
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+
+# Keyed by mtime so edits to the settings file are picked up without a restart.
+@lru_cache(maxsize=8)
+def _read_settings(config_path: str, mtime_ns: int) -> dict[str, Any]:
+    return yaml.load(Path(config_path).read_text(), Loader=_SafeLoader) or {}
+
 
 def load_settings(path: str | None = None) -> dict[str, Any]:
     config_path = Path(path or os.getenv("MUSIC_SETTINGS_PATH", "config/settings.example.yaml"))
-    if not config_path.exists():
+    try:
+        mtime_ns = config_path.stat().st_mtime_ns
+    except FileNotFoundError:
         return {}
-    return yaml.safe_load(config_path.read_text()) or {}
+    return _read_settings(str(config_path), mtime_ns)
 
 
 def cache_config(settings: dict[str, Any]) -> tuple[str, str]:
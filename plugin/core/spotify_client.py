@@ -1,10 +1,32 @@
 from __future__ import annotations
 
 import os
-from typing import Any
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
 
+import orjson
 import requests
 
+from .cache import CacheStore
+from .http import SESSION
+
+# Client-credential tokens live ~1h; refresh slightly early so in-flight searches never carry an expired one.
+_TOKEN_CACHE: dict[str, tuple[str, float]] = {}
+_TOKEN_LOCK = threading.Lock()
+_TOKEN_EXPIRY_MARGIN_SEC = 30
+
+_RATE_LIMIT_RETRIES = 3
+# Total time one request may spend sleeping on 429s; spotify.rate_limit_max_wait_sec overrides it.
+_RATE_LIMIT_MAX_WAIT_SEC = 10.0
+# search_tracks_batch threads that hit the same 429 would otherwise all retry on the same tick.
+_RATE_LIMIT_JITTER_SEC = 0.3
+
+_SEARCH_TTL_SEC = 3600
+_ETAG_TTL_SEC = 7 * 86400
+
 
 class SpotifyClientError(Exception):
     def __init__(self, code: str, message: str) -> None:
@@ -20,17 +42,88 @@ def _credentials_from_settings(settings: dict[str, Any]) -> tuple[str | None, st
     return os.getenv(str(client_id_env)), os.getenv(str(client_secret_env))
 
 
-def get_app_token(settings: dict[str, Any]) -> str | None:
+def _retry_after_sec(resp: requests.Response) -> float:
+    try:
+        return float(resp.headers.get("Retry-After", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _rate_limit_max_wait(settings: dict[str, Any]) -> float:
+    return float((settings.get("spotify") or {}).get("rate_limit_max_wait_sec", _RATE_LIMIT_MAX_WAIT_SEC))
+
+
+def _send_with_backoff(
+    send: Callable[[], requests.Response],
+    max_wait_sec: float = _RATE_LIMIT_MAX_WAIT_SEC,
+) -> requests.Response:
+    waited = 0.0
+    for attempt in range(_RATE_LIMIT_RETRIES):
+        resp = send()
+        if resp.status_code != 429:
+            return resp
+        retry_after = _retry_after_sec(resp)
+        delay = max(retry_after, 2.0**attempt)
+        remaining = max_wait_sec - waited
+        # Sustained throttling asks for minutes or hours; waiting that out would stall every listen.
+        if delay > remaining:
+            raise SpotifyClientError("SPOTIFY_RATE_LIMIT", f"Rate-limited by Spotify (Retry-After: {retry_after:g}s)")
+        delay = min(delay + random.uniform(0.0, _RATE_LIMIT_JITTER_SEC), remaining)
+        time.sleep(delay)
+        waited += delay
+    return send()
+
+
+def _remember_token(client_id: str, token: str, ttl_sec: float) -> None:
+    with _TOKEN_LOCK:
+        _TOKEN_CACHE[client_id] = (token, time.monotonic() + ttl_sec)
+
+
+def _token_kv_key(client_id: str) -> str:
+    return f"spotify:token:{client_id}"
+
+
+def _forget_token(client_id: str, token: str, cache: CacheStore | None = None) -> None:
+    # Only drop the rejected token; another thread may already have stored a fresh one.
+    with _TOKEN_LOCK:
+        cached = _TOKEN_CACHE.get(client_id)
+        if cached and cached[0] == token:
+            del _TOKEN_CACHE[client_id]
+    # The sqlite copy outlives the process, so a rejected token would otherwise come back on restart.
+    if cache is not None:
+        stored = cache.get_kv(_token_kv_key(client_id))
+        if stored and stored[0] == token:
+            cache.delete_kv(_token_kv_key(client_id))
+
+
+def get_app_token(settings: dict[str, Any], cache: CacheStore | None = None) -> str | None:
     client_id, client_secret = _credentials_from_settings(settings)
     if not client_id or not client_secret:
         return None
 
+    with _TOKEN_LOCK:
+        cached = _TOKEN_CACHE.get(client_id)
+    if cached and time.monotonic() < cached[1] - _TOKEN_EXPIRY_MARGIN_SEC:
+        return cached[0]
+
+    # Each CLI run is a fresh process, so the token is also kept in the sqlite cache when one is given.
+    kv_key = _token_kv_key(client_id)
+    if cache is not None:
+        stored = cache.get_kv(kv_key)
+        if stored:
+            token, expires_at = stored
+            _remember_token(client_id, token, expires_at - time.time() + _TOKEN_EXPIRY_MARGIN_SEC)
+            return token
+
     timeout_sec = int((settings.get("spotify") or {}).get("request_timeout_sec", 10))
-    resp = requests.post(
-        "https://accounts.spotify.com/api/token",
-        data={"grant_type": "client_credentials"},
-        auth=(client_id, client_secret),
-        timeout=timeout_sec,
+    resp = _send_with_backoff(
+        lambda: SESSION.post(
+            "https://accounts.spotify.com/api/token",
+            data={"grant_type": "client_credentials"},
+            auth=(client_id, client_secret),
+            timeout=timeout_sec,
+        ),
+        _rate_limit_max_wait(settings),
     )
     if resp.status_code != 200:
         raise SpotifyClientError("SPOTIFY_AUTH_FAILED", f"Token request failed: {resp.status_code}")
@@ -39,34 +132,125 @@ def get_app_token(settings: dict[str, Any]) -> str | None:
     token = payload.get("access_token")
     if not token:
         raise SpotifyClientError("SPOTIFY_AUTH_FAILED", "Missing access_token in Spotify response")
+    ttl_sec = int(payload.get("expires_in", 3600))
+    _remember_token(client_id, str(token), ttl_sec)
+    if cache is not None:
+        cache.put_kv(kv_key, str(token), int(time.time()) + ttl_sec - _TOKEN_EXPIRY_MARGIN_SEC)
     return str(token)
 
 
-def search_tracks(query: str, settings: dict[str, Any], limit: int = 5) -> list[dict[str, Any]]:
-    token = get_app_token(settings)
-    if not token:
+# Fields read by discover_with_spotify and _spotify_metadata; the rest of a track object
+# (available_markets, album images, ...) is most of its size and ends up in every cached DiscoveryResult.
+_TRACK_FIELDS = ("id", "name", "duration_ms", "external_urls", "external_ids", "popularity")
+_ALBUM_FIELDS = ("name", "release_date")
+
+
+def _project_track(item: dict[str, Any]) -> dict[str, Any]:
+    track = {field: item[field] for field in _TRACK_FIELDS if field in item}
+    artists = item.get("artists")
+    if isinstance(artists, list):
+        track["artists"] = [{"name": a.get("name")} for a in artists if isinstance(a, dict)]
+    album = item.get("album")
+    if isinstance(album, dict):
+        track["album"] = {field: album[field] for field in _ALBUM_FIELDS if field in album}
+    return track
+
+
+def _tracks_from_payload(payload: dict[str, Any]) -> list[dict[str, Any]]:
+    tracks = (((payload.get("tracks") or {}).get("items")) or [])
+    if not isinstance(tracks, list):
         return []
+    return [_project_track(item) for item in tracks if isinstance(item, dict)]
 
+
+def search_tracks(
+    query: str,
+    settings: dict[str, Any],
+    limit: int = 5,
+    cache: CacheStore | None = None,
+) -> list[dict[str, Any]]:
     cfg = settings.get("spotify") or {}
     timeout_sec = int(cfg.get("request_timeout_sec", 10))
     market = str(cfg.get("market", "US"))
 
-    headers = {"Authorization": f"Bearer {token}"}
+    # Fresh bodies are served straight from the query cache; once stale, the stored ETag lets
+    # Spotify answer 304 instead of resending the body.
+    search_key = f"spotify:search:{market}:{limit}:{query}"
+    etag_key = f"{search_key}:etag"
+    revalidate: dict[str, Any] | None = None
+    if cache is not None:
+        cached_body = cache.get_query(search_key, ttl_sec=_SEARCH_TTL_SEC)
+        if cached_body:
+            return _tracks_from_payload(orjson.loads(cached_body))
+        stored = cache.get_kv(etag_key)
+        if stored:
+            revalidate = orjson.loads(stored[0])
+
+    token = get_app_token(settings, cache=cache)
+    if not token:
+        return []
+
     params = {"q": query, "type": "track", "limit": limit, "market": market}
-    resp = requests.get(
-        "https://api.spotify.com/v1/search",
-        headers=headers,
-        params=params,
-        timeout=timeout_sec,
-    )
-    if resp.status_code == 429:
-        retry_after = resp.headers.get("Retry-After", "unknown")
-        raise SpotifyClientError("SPOTIFY_RATE_LIMIT", f"Rate-limited by Spotify (Retry-After: {retry_after}s)")
-    if resp.status_code != 200:
-        raise SpotifyClientError("SPOTIFY_SEARCH_FAILED", f"Search request failed: {resp.status_code}")
 
-    payload = resp.json()
-    tracks = (((payload.get("tracks") or {}).get("items")) or [])
-    if not isinstance(tracks, list):
+    def _search(bearer: str) -> requests.Response:
+        headers = {"Authorization": f"Bearer {bearer}"}
+        if revalidate:
+            headers["If-None-Match"] = revalidate["etag"]
+        return _send_with_backoff(
+            lambda: SESSION.get(
+                "https://api.spotify.com/v1/search",
+                headers=headers,
+                params=params,
+                timeout=timeout_sec,
+            ),
+            _rate_limit_max_wait(settings),
+        )
+
+    resp = _search(token)
+    if resp.status_code == 401:
+        # Revoked or rotated credentials reject a token before its expiry; refresh it and retry once.
+        client_id, _ = _credentials_from_settings(settings)
+        _forget_token(str(client_id), token, cache)
+        token = get_app_token(settings, cache=cache)
+        if not token:
+            return []
+        resp = _search(token)
+    if resp.status_code == 304 and revalidate:
+        body = revalidate["body"]
+        tracks = _tracks_from_payload(orjson.loads(body))
+    else:
+        if resp.status_code == 429:
+            retry_after = resp.headers.get("Retry-After", "unknown")
+            raise SpotifyClientError("SPOTIFY_RATE_LIMIT", f"Rate-limited by Spotify (Retry-After: {retry_after}s)")
+        if resp.status_code != 200:
+            raise SpotifyClientError("SPOTIFY_SEARCH_FAILED", f"Search request failed: {resp.status_code}")
+        tracks = _tracks_from_payload(resp.json())
+        body = orjson.dumps({"tracks": {"items": tracks}}).decode()
+
+    if cache is not None:
+        with cache.transaction():
+            cache.put_query(search_key, body)
+            etag = resp.headers.get("ETag") or (revalidate or {}).get("etag")
+            if etag:
+                cache.put_kv(
+                    etag_key,
+                    orjson.dumps({"etag": etag, "body": body}).decode(),
+                    int(time.time()) + _ETAG_TTL_SEC,
+                )
+    return tracks
+
+
+def search_tracks_batch(
+    queries: list[str],
+    settings: dict[str, Any],
+    limit: int = 5,
+    max_workers: int = 8,
+    cache: CacheStore | None = None,
+) -> list[list[dict[str, Any]]]:
+    if not queries:
         return []
-    return [item for item in tracks if isinstance(item, dict)]
+    # Fetch the app token once up front so the workers share it instead of racing to request one each.
+    if not get_app_token(settings, cache=cache):
+        return [[] for _ in queries]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(queries)))) as pool:
+        return list(pool.map(lambda query: search_tracks(query, settings, limit=limit, cache=cache), queries))
@@ -3,7 +3,21 @@ from __future__ import annotations
 from .models import DescriptorArtifact, FeatureResult, LyricsAnalysisResult, MetadataArtifact, SourceCandidate, SynthesisResult
 
 
-PROMPT_TEMPLATE = """You are listening to a song as a careful human critic.
+def _render_prompt(
+    title: str,
+    artist: str,
+    confidence: float,
+    tempo: float,
+    key: str,
+    mode: str,
+    rms: float,
+    dr: float,
+    energy: float,
+    centroid: float,
+    onset_density: float,
+    section_count: int,
+) -> str:
+    return f"""You are listening to a song as a careful human critic.
 Use only the provided structured features.
 Clearly separate direct evidence from interpretation.
 Do not invent lyrics or artist intent.
@@ -14,13 +28,13 @@ Song:
 - Source confidence: {confidence:.2f}
 
 Features:
-- Tempo BPM: {tempo}
+- Tempo BPM: {tempo:.2f}
 - Key/Mode: {key} {mode}
-- RMS loudness: {rms}
-- Dynamic range: {dr}
-- Energy mean: {energy}
-- Spectral centroid mean: {centroid}
-- Onset density: {onset_density}
+- RMS loudness: {rms:.5f}
+- Dynamic range: {dr:.5f}
+- Energy mean: {energy:.5f}
+- Spectral centroid mean: {centroid:.2f}
+- Onset density: {onset_density:.5f}
 - Section count: {section_count}
 
 Respond with:
@@ -79,19 +93,19 @@ def build_synthesis(
             "either reinforces or gently contrasts the sonic mood to create a fuller emotional arc."
         )
 
-    prompt = PROMPT_TEMPLATE.format(
-        title=source.title,
-        artist=source.artist_guess or "unknown",
-        confidence=source.confidence,
-        tempo=f"{tempo:.2f}",
-        key=features.key or "unknown",
-        mode=features.mode,
-        rms=f"{(features.loudness_rms or 0.0):.5f}",
-        dr=f"{(features.dynamic_range or 0.0):.5f}",
-        energy=f"{(features.energy_mean or 0.0):.5f}",
-        centroid=f"{(features.spectral_centroid_mean or 0.0):.2f}",
-        onset_density=f"{(features.onset_density or 0.0):.5f}",
-        section_count=len(features.section_map),
+    prompt = _render_prompt(
+        source.title,
+        source.artist_guess or "unknown",
+        source.confidence,
+        tempo,
+        features.key or "unknown",
+        features.mode,
+        features.loudness_rms or 0.0,
+        features.dynamic_range or 0.0,
+        energy,
+        features.spectral_centroid_mean or 0.0,
+        features.onset_density or 0.0,
+        len(features.section_map),
     )
 
     return SynthesisResult(
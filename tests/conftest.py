@@ -1,8 +1,70 @@
 from __future__ import annotations
 
+import socket
 import sys
 from pathlib import Path
+from typing import Callable
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+import pytest
+
+from plugin.core.cache import CacheStore
+
+_REAL_CONNECT = socket.socket.connect
+
+_CREDENTIAL_ENV = (
+    "YOUTUBE_API_KEY",
+    "SPOTIFY_CLIENT_ID",
+    "SPOTIFY_CLIENT_SECRET",
+    "JAMENDO_CLIENT_ID",
+    "MUSIC_SETTINGS_PATH",
+    "LISTEN_PARALLEL_ANALYSIS",
+)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Keep developer/CI credentials from enabling live providers, so runs (and xdist workers) agree.
+    for name in _CREDENTIAL_ENV:
+        monkeypatch.delenv(name, raising=False)
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line("markers", "allow_network: let the test open real TCP/UDP connections")
+
+
+@pytest.fixture(autouse=True)
+def _no_network(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> None:
+    if request.node.get_closest_marker("allow_network"):
+        return
+
+    # Fail fast on a missed mock instead of waiting on a provider; unix sockets stay usable.
+    def _guarded(sock: socket.socket, address) -> None:
+        if sock.family in (socket.AF_INET, socket.AF_INET6):
+            raise RuntimeError(f"network access in unit test: {address!r}")
+        return _REAL_CONNECT(sock, address)
+
+    monkeypatch.setattr(socket.socket, "connect", _guarded)
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> CacheStore:
+    store = CacheStore(root_dir=str(tmp_path / "cache"), sqlite_path=str(tmp_path / "cache" / "index.sqlite"))
+    # tmp_path databases are throwaway; skip the WAL checkpoint fsyncs.
+    store.conn.execute("PRAGMA synchronous=OFF")
+    return store
+
+
+@pytest.fixture
+def raiser() -> Callable[[Exception], Callable[..., None]]:
+    # Stand-in for a provider call that fails with the given exception.
+    def _raiser(exc: Exception) -> Callable[..., None]:
+        def _raise(*args, **kwargs) -> None:
+            raise exc
+
+        return _raise
+
+    return _raiser
@@ -3,14 +3,14 @@ from __future__ import annotations
 from pathlib import Path
 
 import numpy as np
+import pytest
 import soundfile as sf
 
 from plugin.core.analysis import analyze_audio
 from plugin.core.cache import CacheStore
 
 
-def test_analyze_audio_extracts_features_and_caches(tmp_path: Path) -> None:
-    cache = CacheStore(root_dir=str(tmp_path / "cache"), sqlite_path=str(tmp_path / "cache" / "index.sqlite"))
+def test_analyze_audio_extracts_features_and_caches(tmp_path: Path, cache: CacheStore) -> None:
     audio_path = tmp_path / "tone.wav"
 
     sr = 22050
@@ -25,3 +25,37 @@ def test_analyze_audio_extracts_features_and_caches(tmp_path: Path) -> None:
     assert first.key is not None
     assert first.energy_mean is not None
     assert second.tempo_bpm == first.tempo_bpm
+    assert second.model_dump() == first.model_dump()
+
+
+def test_key_from_chroma_picks_rolled_template() -> None:
+    from plugin.core.analysis import MINOR_TEMPLATE, _key_from_chroma
+
+    chroma = np.tile(np.roll(MINOR_TEMPLATE, 9), (4, 1)).T
+    assert _key_from_chroma(chroma) == ("A", "minor")
+    assert _key_from_chroma(np.ones((12, 4))) == ("C", "unknown")
+
+
+def test_analyze_audio_in_worker_process(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, cache: CacheStore) -> None:
+    from plugin.core import analysis
+    from plugin.core.errors import AnalysisError
+
+    monkeypatch.setenv("LISTEN_PARALLEL_ANALYSIS", "1")
+    monkeypatch.setattr(analysis, "_ANALYSIS_POOL", None)
+    audio_path = tmp_path / "tone.wav"
+    sr = 22050
+    t = np.linspace(0, 1.0, sr, endpoint=False)
+    sf.write(audio_path, 0.2 * np.sin(2 * np.pi * 440.0 * t), sr)
+
+    try:
+        feature = analyze_audio(str(audio_path), cache)
+        assert feature.energy_mean is not None
+        assert cache.get_feature_path(cache.normalize_key(str(audio_path)))
+        assert analysis._ANALYSIS_POOL._mp_context.get_start_method() == "spawn"
+
+        with pytest.raises(AnalysisError) as exc:
+            analyze_audio(str(tmp_path / "missing.wav"), cache)
+        assert exc.value.code == "ANALYSIS_AUDIO_LOAD_FAILED"
+    finally:
+        if analysis._ANALYSIS_POOL is not None:
+            analysis._ANALYSIS_POOL.shutdown()
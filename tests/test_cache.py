@@ -13,6 +13,13 @@ def test_query_cache_put_and_get(tmp_path: Path) -> None:
     assert cache.get_query("Listen to Good News", ttl_sec=60) == '{"ok": true}'
 
 
+def test_normalize_key_is_stable_sha256() -> None:
+    import hashlib
+
+    expected = hashlib.sha256(b"ytdlp:abc").hexdigest()
+    assert CacheStore.normalize_key("  YTDLP:abc ") == expected
+
+
 def test_query_cache_ttl_expiry(tmp_path: Path) -> None:
     cache = CacheStore(root_dir=str(tmp_path / "cache"), sqlite_path=str(tmp_path / "cache" / "index.sqlite"))
     cache.put_query("abc", "payload")
@@ -52,6 +59,10 @@ def test_cache_status_flags(tmp_path: Path) -> None:
     status = cache.cache_status(key)
     assert status["query_cached"] is True
     assert status["audio_cached"] is True
+    assert status["audio_path"] == str(audio)
+    assert status["feature_cached"] is False
+    assert status["feature_path"] is None
+    assert status["lyrics_cached"] is False
 
 
 def test_lyrics_cache_roundtrip(tmp_path: Path) -> None:
@@ -70,3 +81,76 @@ def test_lyrics_analysis_cache_roundtrip(tmp_path: Path) -> None:
 
     cache.put_lyrics_analysis(lyrics_key, analysis)
     assert cache.get_lyrics_analysis(lyrics_key) == analysis
+
+
+def test_memory_layer_serves_warm_reads_and_drops_missing_files(tmp_path: Path) -> None:
+    cache = CacheStore(root_dir=str(tmp_path / "cache"), sqlite_path=str(tmp_path / "cache" / "index.sqlite"))
+    cache.put_query("warm", "payload")
+    cache.conn.execute("DELETE FROM query_cache")
+    assert cache.get_query("warm", ttl_sec=60) == "payload"
+
+    audio = tmp_path / "cache" / "audio" / "m.wav"
+    audio.write_bytes(b"audio")
+    cache.put_audio("m", str(audio), "wav")
+    audio.unlink()
+    assert cache.get_audio("m") is None
+
+
+def test_transaction_commits_once_and_rolls_back_on_error(tmp_path: Path) -> None:
+    cache = CacheStore(root_dir=str(tmp_path / "cache"), sqlite_path=str(tmp_path / "cache" / "index.sqlite"))
+    with cache.transaction():
+        cache.put_lyrics("a", "one")
+        cache.put_lyrics("b", "two")
+    assert cache.get_lyrics("a") == "one"
+    assert cache.get_lyrics("b") == "two"
+
+    try:
+        with cache.transaction():
+            cache.put_query("rolled-back", "payload")
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert cache.get_query("rolled-back", ttl_sec=60) is None
+
+
+def test_reads_wait_for_open_transaction(tmp_path: Path) -> None:
+    import threading
+
+    cache = CacheStore(root_dir=str(tmp_path / "cache"), sqlite_path=str(tmp_path / "cache" / "index.sqlite"))
+    written = threading.Event()
+    release = threading.Event()
+    seen: list[str | None] = []
+
+    def _writer() -> None:
+        try:
+            with cache.transaction():
+                cache.put_query("pending", "payload")
+                written.set()
+                release.wait(5)
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+
+    writer = threading.Thread(target=_writer)
+    writer.start()
+    assert written.wait(5)
+    reader = threading.Thread(target=lambda: seen.append(cache.get_query("pending", ttl_sec=60)))
+    reader.start()
+    reader.join(0.2)
+    assert reader.is_alive()
+
+    release.set()
+    writer.join(5)
+    reader.join(5)
+    assert seen == [None]
+    assert cache.get_query("pending", ttl_sec=60) is None
+
+
+def test_kv_cache_respects_expiry(tmp_path: Path) -> None:
+    cache = CacheStore(root_dir=str(tmp_path / "cache"), sqlite_path=str(tmp_path / "cache" / "index.sqlite"))
+    now = int(time.time())
+    cache.put_kv("fresh", "v1", now + 60)
+    cache.put_kv("stale", "v2", now - 1)
+    assert cache.get_kv("fresh") == ("v1", now + 60)
+    assert cache.get_kv("stale") is None
+    assert cache.get_kv("missing") is None
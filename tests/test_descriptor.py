@@ -2,14 +2,16 @@ from __future__ import annotations
 
 import pytest
 
+from plugin.core.cache import CacheStore
 from plugin.core.descriptor import build_descriptor_artifact
 from plugin.core.models import MetadataArtifact, SourceCandidate
 
 
 class _Resp:
-    def __init__(self, status_code: int, payload: dict | None = None) -> None:
+    def __init__(self, status_code: int, payload: dict | None = None, headers: dict | None = None) -> None:
         self.status_code = status_code
         self._payload = payload or {}
+        self.headers = headers or {}
 
     def json(self):
         return self._payload
@@ -51,7 +53,7 @@ def test_build_descriptor_artifact_maps_acousticbrainz_and_deezer(monkeypatch: p
             return _Resp(200, {"id": 1, "bpm": 121, "gain": -9.8})
         return _Resp(404, {})
 
-    monkeypatch.setattr("plugin.core.descriptor.requests.get", fake_get)
+    monkeypatch.setattr("plugin.core.descriptor.SESSION.get", fake_get)
 
     out = build_descriptor_artifact(source, metadata, settings={"descriptors": {"enabled": True, "min_confidence": 0.1}})
     assert out is not None
@@ -72,6 +74,71 @@ def test_build_descriptor_artifact_returns_none_when_below_confidence(monkeypatc
             return _Resp(200, {"recordings": []})
         return _Resp(404, {})
 
-    monkeypatch.setattr("plugin.core.descriptor.requests.get", fake_get)
+    monkeypatch.setattr("plugin.core.descriptor.SESSION.get", fake_get)
     out = build_descriptor_artifact(source, metadata, settings={"descriptors": {"enabled": True, "min_confidence": 0.45}})
     assert out is None
+
+
+def test_build_descriptor_artifact_reuses_cached_lookups(monkeypatch: pytest.MonkeyPatch, cache: CacheStore) -> None:
+    source = SourceCandidate(provider="spotify", source_type="metadata", source_id="sp1", title="Song", artist_guess="Artist")
+    metadata = MetadataArtifact(source="spotify", title="Song", artists=["Artist"], isrc="USWB11801008")
+    calls: list[str] = []
+
+    def fake_get(url, params=None, headers=None, timeout=10):
+        calls.append(url)
+        if "musicbrainz.org" in url:
+            return _Resp(200, {"recordings": [{"id": "mbid1"}]})
+        if "acousticbrainz.org/mbid1/low-level" in url:
+            return _Resp(200, {"rhythm": {"bpm": 120.0}, "tonal": {"key_key": "C", "key_scale": "major"}})
+        if "acousticbrainz.org/mbid1/high-level" in url:
+            return _Resp(404, {})
+        if "api.deezer.com" in url:
+            return _Resp(200, {"id": 1, "bpm": 121, "gain": -9.8})
+        return _Resp(404, {})
+
+    monkeypatch.setattr("plugin.core.descriptor.SESSION.get", fake_get)
+    settings = {"descriptors": {"enabled": True, "min_confidence": 0.1}}
+
+    first = build_descriptor_artifact(source, metadata, settings=settings, cache=cache)
+    first_calls = len(calls)
+    second = build_descriptor_artifact(source, metadata, settings=settings, cache=cache)
+    assert first is not None and second is not None
+    assert second.tempo_bpm == first.tempo_bpm == 120.0
+    # Only the high-level miss is retried; every successful lookup is served from the cache.
+    assert calls[first_calls:] == ["https://acousticbrainz.org/mbid1/high-level"]
+
+
+def test_fetch_acousticbrainz_revalidates_with_etag(monkeypatch: pytest.MonkeyPatch, cache: CacheStore) -> None:
+    from plugin.core.descriptor import _fetch_acousticbrainz
+
+    seen_headers: list[dict | None] = []
+    responses = iter([_Resp(200, {"rhythm": {"bpm": 98.0}}, headers={"ETag": '"ab1"'}), _Resp(304)])
+
+    def fake_get(url, params=None, headers=None, timeout=10):
+        seen_headers.append(headers)
+        return next(responses)
+
+    monkeypatch.setattr("plugin.core.descriptor.SESSION.get", fake_get)
+    # Store the first lookup already expired so the second call has to revalidate it.
+    monkeypatch.setattr("plugin.core.descriptor._LOOKUP_TTL_SEC", -1)
+    assert _fetch_acousticbrainz("mbid1", "low-level", timeout_sec=5, cache=cache) == {"rhythm": {"bpm": 98.0}}
+    assert cache.get_kv("descriptor:etag:https://acousticbrainz.org/mbid1/low-level")[0] == '"ab1"'
+
+    assert _fetch_acousticbrainz("mbid1", "low-level", timeout_sec=5, cache=cache) == {"rhythm": {"bpm": 98.0}}
+    assert seen_headers == [None, {"If-None-Match": '"ab1"'}]
+
+
+def test_fetch_acousticbrainz_ignores_malformed_body(monkeypatch: pytest.MonkeyPatch, cache: CacheStore) -> None:
+    from plugin.core.descriptor import _fetch_acousticbrainz
+
+    class _HtmlResp(_Resp):
+        def json(self):
+            raise ValueError("Expecting value: line 1 column 1 (char 0)")
+
+    monkeypatch.setattr(
+        "plugin.core.descriptor.SESSION.get",
+        lambda *args, **kwargs: _HtmlResp(200, headers={"ETag": '"maint"'}),
+    )
+    assert _fetch_acousticbrainz("mbid1", "low-level", timeout_sec=5, cache=cache) is None
+    assert cache.get_kv("descriptor:acousticbrainz:mbid1:low-level") is None
+    assert cache.get_kv("descriptor:etag:https://acousticbrainz.org/mbid1/low-level") is None
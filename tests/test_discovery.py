@@ -1,48 +1,83 @@
 from __future__ import annotations
 
-import json
-from subprocess import CompletedProcess
+from typing import Callable
 
+import orjson
 import pytest
 
-from plugin.core.discovery import _score, discover_song, discover_with_jamendo, discover_with_spotify, discover_with_ytdlp
+from plugin.core.discovery import _fold_accents, _ratio, _score_batch, _score_ctx, _token_overlap, discover_song, discover_with_jamendo, discover_with_spotify, discover_with_ytdlp
 from plugin.core.errors import DiscoveryError
 
 
 @pytest.fixture
-def ytdlp_payload() -> str:
-    return json.dumps(
+def ytdlp_lines() -> list[bytes]:
+    entries = [
         {
-            "entries": [
-                {
-                    "id": "abc",
-                    "title": "Mac Miller - Good News",
-                    "uploader": "MacMillerVEVO",
-                    "duration": 332,
-                    "webpage_url": "https://www.youtube.com/watch?v=abc",
-                },
-                {
-                    "id": "def",
-                    "title": "Other Song",
-                    "uploader": "Other",
-                    "duration": 200,
-                },
-            ]
-        }
-    )
+            "id": "abc",
+            "title": "Mac Miller - Good News",
+            "uploader": "MacMillerVEVO",
+            "duration": 332,
+            "webpage_url": "https://www.youtube.com/watch?v=abc",
+        },
+        {
+            "id": "def",
+            "title": "Other Song",
+            "uploader": "Other",
+            "duration": 200,
+        },
+    ]
+    return [orjson.dumps(entry) + b"\n" for entry in entries]
+
+
+class _FakePopen:
+    def __init__(self, lines: list[bytes], returncode: int = 0) -> None:
+        self.stdout = iter(lines)
+        self.returncode = returncode
 
+    def __enter__(self):
+        return self
 
-def test_discover_with_ytdlp_parses_candidates(monkeypatch: pytest.MonkeyPatch, ytdlp_payload: str) -> None:
-    def fake_run(*args, **kwargs):
-        return CompletedProcess(args=args, returncode=0, stdout=ytdlp_payload, stderr="")
+    def __exit__(self, *exc_info) -> None:
+        return None
 
-    monkeypatch.setattr("plugin.core.discovery.subprocess.run", fake_run)
+    def kill(self) -> None:
+        return None
+
+
+def test_discover_with_ytdlp_parses_candidates(monkeypatch: pytest.MonkeyPatch, ytdlp_lines: list[bytes]) -> None:
+    monkeypatch.setattr("plugin.core.discovery.subprocess.Popen", lambda *args, **kwargs: _FakePopen(ytdlp_lines))
     out = discover_with_ytdlp("Mac Miller Good News")
     assert out
     assert out[0].source_id == "abc"
     assert out[0].provider == "ytdlp"
 
 
+def test_discover_with_ytdlp_scores_candidates_in_one_batch(
+    monkeypatch: pytest.MonkeyPatch, ytdlp_lines: list[bytes]
+) -> None:
+    from plugin.core import discovery
+
+    batch_sizes: list[int] = []
+
+    def _counting_score_batch(ctx, titles, artists, durations):
+        batch_sizes.append(len(titles))
+        return _score_batch(ctx, titles, artists, durations)
+
+    monkeypatch.setattr("plugin.core.discovery.subprocess.Popen", lambda *args, **kwargs: _FakePopen(ytdlp_lines))
+    monkeypatch.setattr(discovery, "_score_batch", _counting_score_batch)
+    out = discover_with_ytdlp("Mac Miller Good News")
+
+    assert batch_sizes == [len(out)]
+    assert out[0].confidence > out[-1].confidence
+
+
+def test_discover_with_ytdlp_reports_failure(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("plugin.core.discovery.subprocess.Popen", lambda *args, **kwargs: _FakePopen([], returncode=1))
+    with pytest.raises(DiscoveryError) as exc:
+        discover_with_ytdlp("Mac Miller Good News")
+    assert exc.value.code == "DISCOVERY_YTDLP_FAILED"
+
+
 def test_discover_song_prefers_high_confidence(monkeypatch: pytest.MonkeyPatch) -> None:
     from plugin.core.models import SourceCandidate
 
@@ -53,7 +88,7 @@ def test_discover_song_prefers_high_confidence(monkeypatch: pytest.MonkeyPatch)
         ],
     )
     monkeypatch.setattr("plugin.core.discovery.discover_with_youtube_api", lambda query, max_results=5: [])
-    monkeypatch.setattr("plugin.core.discovery.discover_with_spotify", lambda query, max_results=5, settings=None: [])
+    monkeypatch.setattr("plugin.core.discovery.discover_with_spotify", lambda query, max_results=5, settings=None, cache=None: [])
     monkeypatch.setattr("plugin.core.discovery.discover_with_musicbrainz", lambda query, max_results=5: [])
 
     out = discover_song("right song")
@@ -62,10 +97,41 @@ def test_discover_song_prefers_high_confidence(monkeypatch: pytest.MonkeyPatch)
     assert out.provider_trace[0].startswith("ytdlp:")
 
 
+def test_discover_song_accepts_early_above_threshold(monkeypatch: pytest.MonkeyPatch) -> None:
+    import threading
+
+    from plugin.core.models import SourceCandidate
+
+    release = threading.Event()
+
+    def _slow(query, max_results=5, **kwargs):
+        release.wait(5)
+        return []
+
+    monkeypatch.setattr(
+        "plugin.core.discovery.discover_with_ytdlp",
+        lambda query, max_results=5: [
+            SourceCandidate(provider="ytdlp", source_id="1", title="Right song", confidence=0.95),
+        ],
+    )
+    monkeypatch.setattr("plugin.core.discovery.discover_with_youtube_api", _slow)
+    monkeypatch.setattr("plugin.core.discovery.discover_with_jamendo", _slow)
+    monkeypatch.setattr("plugin.core.discovery.discover_with_spotify", _slow)
+    monkeypatch.setattr("plugin.core.discovery.discover_with_musicbrainz", _slow)
+
+    try:
+        out = discover_song("right song", settings={"discovery": {"accept_threshold": 0.9}})
+    finally:
+        release.set()
+    assert out.selected is not None and out.selected.source_id == "1"
+    assert out.provider_trace[0] == "ytdlp:1"
+    assert "spotify:skipped" in out.provider_trace
+
+
 def test_discover_song_not_found_raises(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr("plugin.core.discovery.discover_with_ytdlp", lambda query, max_results=5: [])
     monkeypatch.setattr("plugin.core.discovery.discover_with_youtube_api", lambda query, max_results=5: [])
-    monkeypatch.setattr("plugin.core.discovery.discover_with_spotify", lambda query, max_results=5, settings=None: [])
+    monkeypatch.setattr("plugin.core.discovery.discover_with_spotify", lambda query, max_results=5, settings=None, cache=None: [])
     monkeypatch.setattr("plugin.core.discovery.discover_with_musicbrainz", lambda query, max_results=5: [])
 
     with pytest.raises(DiscoveryError) as exc:
@@ -78,7 +144,7 @@ def test_discover_with_spotify_maps_candidates(monkeypatch: pytest.MonkeyPatch)
     monkeypatch.setenv("SPOTIFY_CLIENT_SECRET", "secret")
     monkeypatch.setattr(
         "plugin.core.discovery.search_tracks",
-        lambda query, settings, limit=5: [
+        lambda query, settings, limit=5, cache=None: [
             {
                 "id": "sp1",
                 "name": "Good News",
@@ -96,21 +162,68 @@ def test_discover_with_spotify_maps_candidates(monkeypatch: pytest.MonkeyPatch)
 
 
 def test_score_is_accent_insensitive() -> None:
-    with_accent = _score(
-        "De Repente Lembrei de Voce Ulisses Rocha",
-        "De Repente Lembrei de Você",
-        "Ulisses Rocha",
-        240,
-    )
-    without_accent = _score(
-        "De Repente Lembrei de Voce Ulisses Rocha",
-        "De Repente Lembrei de Voce",
-        "Ulisses Rocha",
-        240,
+    ctx = _score_ctx("De Repente Lembrei de Voce Ulisses Rocha")
+    with_accent, without_accent = _score_batch(
+        ctx,
+        ["De Repente Lembrei de Você", "De Repente Lembrei de Voce"],
+        ["Ulisses Rocha", "Ulisses Rocha"],
+        [240, 240],
     )
     assert abs(with_accent - without_accent) < 0.02
 
 
+def test_fold_accents_strips_combining_marks() -> None:
+    assert _fold_accents("Você Ñandú Ångström") == "Voce Nandu Angstrom"
+    assert _fold_accents("ﬁ") == "fi"
+
+
+def test_ratio_is_normalized_similarity() -> None:
+    assert _ratio("good news", "good news") == 1.0
+    assert _ratio("abc", "xyz") == 0.0
+    assert _ratio("mac miller good news", "mac miller good news official audio") == pytest.approx(0.7273, abs=1e-4)
+
+
+def test_token_overlap_counts_each_query_token_once() -> None:
+    assert _token_overlap(frozenset({"bad", "leroy"}), "bad bad leroy brown") == 1.0
+    assert _token_overlap(frozenset({"good", "news"}), "bad news") == 0.5
+    assert _token_overlap(frozenset(), "anything") == 0.0
+
+
+def test_score_artist_only_query_ranks_matching_artist() -> None:
+    ctx = _score_ctx("Mac Miller")
+    batch = _score_batch(ctx, ["Good News", "Shake It Off"], ["Mac Miller", "Taylor Swift"], [332, 219])
+    assert batch[0] > batch[1]
+
+    ctx = _score_ctx("beyonce halo")
+    batch = _score_batch(ctx, ["Hallo", "Completely Unrelated"], ["Beyonce", "Someone Else"], [261, 261])
+    assert batch[0] > batch[1]
+
+
+def test_score_without_title_or_artist_overlap_only_counts_duration() -> None:
+    ctx = _score_ctx("Mac Miller Good News")
+    score = _score_batch(ctx, ["Completely Unrelated"], ["Someone Else"], [200])[0]
+    assert score == pytest.approx(ctx.weights["duration_sanity"])
+
+
+def test_score_prefilter_drops_typo_only_matches() -> None:
+    # Pins the prefilter approximation: a misspelled title and artist with no exact token in
+    # common scores like an unrelated track.
+    ctx = _score_ctx("bohemian rhapsody queen")
+    typo, unrelated = _score_batch(ctx, ["Bohemain Rapsody", "Completely Unrelated"], ["Qeen", "Someone Else"], [354, 354])
+    assert typo == unrelated == pytest.approx(ctx.weights["duration_sanity"])
+
+
+def test_score_batch_matches_single_scores() -> None:
+    rows = [
+        ("Mac Miller - Good News", "MacMillerVEVO", 332),
+        ("Other Song", None, None),
+        ("Good News", "Mac Miller", 30),
+    ]
+    ctx = _score_ctx("Mac Miller Good News")
+    batch = _score_batch(ctx, *map(list, zip(*rows)))
+    assert batch.tolist() == [_score_batch(ctx, [title], [artist], [duration])[0] for title, artist, duration in rows]
+
+
 def test_discover_song_obscure_title_ranks_correct_candidate(monkeypatch: pytest.MonkeyPatch) -> None:
     from plugin.core.models import SourceCandidate
 
@@ -132,7 +245,7 @@ def test_discover_song_obscure_title_ranks_correct_candidate(monkeypatch: pytest
             ),
         ],
     )
-    monkeypatch.setattr("plugin.core.discovery.discover_with_spotify", lambda query, max_results=5, settings=None: [])
+    monkeypatch.setattr("plugin.core.discovery.discover_with_spotify", lambda query, max_results=5, settings=None, cache=None: [])
     monkeypatch.setattr("plugin.core.discovery.discover_with_musicbrainz", lambda query, max_results=5: [])
 
     out = discover_song("De Repente Lembrei de Voce Ulisses Rocha")
@@ -159,7 +272,7 @@ def test_discover_song_dedupes_cross_provider_duplicates(monkeypatch: pytest.Mon
     monkeypatch.setattr("plugin.core.discovery.discover_with_youtube_api", lambda query, max_results=5: [])
     monkeypatch.setattr(
         "plugin.core.discovery.discover_with_spotify",
-        lambda query, max_results=5, settings=None: [
+        lambda query, max_results=5, settings=None, cache=None: [
             SourceCandidate(
                 provider="spotify",
                 source_type="metadata",
@@ -189,7 +302,7 @@ def test_trace_reports_missing_provider_dependency(monkeypatch: pytest.MonkeyPat
     monkeypatch.setattr("plugin.core.discovery.discover_with_youtube_api", lambda query, max_results=5: [])
     monkeypatch.setattr(
         "plugin.core.discovery.discover_with_spotify",
-        lambda query, max_results=5, settings=None: [
+        lambda query, max_results=5, settings=None, cache=None: [
             SourceCandidate(provider="spotify", source_type="metadata", source_id="sp1", title="Song", confidence=0.7)
         ],
     )
@@ -199,16 +312,17 @@ def test_trace_reports_missing_provider_dependency(monkeypatch: pytest.MonkeyPat
     assert any(item.startswith("ytdlp:error:missing_binary") for item in out.provider_trace)
 
 
-def test_not_found_error_includes_actionable_provider_hints(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_not_found_error_includes_actionable_provider_hints(
+    monkeypatch: pytest.MonkeyPatch, raiser: Callable[[Exception], Callable[..., None]]
+) -> None:
     monkeypatch.delenv("YOUTUBE_API_KEY", raising=False)
     monkeypatch.delenv("SPOTIFY_CLIENT_ID", raising=False)
     monkeypatch.delenv("SPOTIFY_CLIENT_SECRET", raising=False)
     monkeypatch.setattr(
-        "plugin.core.discovery.discover_with_ytdlp",
-        lambda query, max_results=5: (_ for _ in ()).throw(DiscoveryError("DISCOVERY_YTDLP_MISSING_BINARY", "missing")),
+        "plugin.core.discovery.discover_with_ytdlp", raiser(DiscoveryError("DISCOVERY_YTDLP_MISSING_BINARY", "missing"))
     )
     monkeypatch.setattr("plugin.core.discovery.discover_with_youtube_api", lambda query, max_results=5: [])
-    monkeypatch.setattr("plugin.core.discovery.discover_with_spotify", lambda query, max_results=5, settings=None: [])
+    monkeypatch.setattr("plugin.core.discovery.discover_with_spotify", lambda query, max_results=5, settings=None, cache=None: [])
     monkeypatch.setattr("plugin.core.discovery.discover_with_musicbrainz", lambda query, max_results=5: [])
 
     with pytest.raises(DiscoveryError) as exc:
@@ -225,10 +339,8 @@ def test_discover_with_jamendo_maps_candidates(monkeypatch: pytest.MonkeyPatch)
 
     class _Resp:
         status_code = 200
-
-        @staticmethod
-        def json():
-            return {
+        content = orjson.dumps(
+            {
                 "results": [
                     {
                         "id": "j1",
@@ -239,8 +351,9 @@ def test_discover_with_jamendo_maps_candidates(monkeypatch: pytest.MonkeyPatch)
                     }
                 ]
             }
+        )
 
-    monkeypatch.setattr("plugin.core.discovery.requests.get", lambda *args, **kwargs: _Resp())
+    monkeypatch.setattr("plugin.core.discovery.SESSION.get", lambda *args, **kwargs: _Resp())
     out = discover_with_jamendo("Artist Song", settings={"jamendo": {"enabled": True}})
     assert out
     assert out[0].provider == "jamendo"
@@ -256,7 +369,7 @@ def test_discover_song_includes_jamendo_trace(monkeypatch: pytest.MonkeyPatch) -
     monkeypatch.setattr("plugin.core.discovery.discover_with_youtube_api", lambda query, max_results=5: [])
     monkeypatch.setattr(
         "plugin.core.discovery.discover_with_jamendo",
-        lambda query, max_results=5, settings=None: [
+        lambda query, max_results=5, settings=None, cache=None: [
             SourceCandidate(
                 provider="jamendo",
                 source_type="youtube",
@@ -268,8 +381,33 @@ def test_discover_song_includes_jamendo_trace(monkeypatch: pytest.MonkeyPatch) -
             )
         ],
     )
-    monkeypatch.setattr("plugin.core.discovery.discover_with_spotify", lambda query, max_results=5, settings=None: [])
+    monkeypatch.setattr("plugin.core.discovery.discover_with_spotify", lambda query, max_results=5, settings=None, cache=None: [])
     monkeypatch.setattr("plugin.core.discovery.discover_with_musicbrainz", lambda query, max_results=5: [])
 
     out = discover_song("Artist Song", settings={"jamendo": {"enabled": True}})
     assert any(item.startswith("jamendo:1") for item in out.provider_trace)
+
+
+def test_discover_song_runs_providers_concurrently(monkeypatch: pytest.MonkeyPatch) -> None:
+    import threading
+
+    from plugin.core.models import SourceCandidate
+
+    barrier = threading.Barrier(2, timeout=5)
+
+    def ytdlp(query, max_results=5):
+        barrier.wait()
+        return [SourceCandidate(provider="ytdlp", source_id="yt1", title="Song", confidence=0.9)]
+
+    def musicbrainz(query, max_results=5):
+        barrier.wait()
+        return []
+
+    monkeypatch.setattr("plugin.core.discovery.discover_with_ytdlp", ytdlp)
+    monkeypatch.setattr("plugin.core.discovery.discover_with_youtube_api", lambda query, max_results=5: [])
+    monkeypatch.setattr("plugin.core.discovery.discover_with_jamendo", lambda query, max_results=5, settings=None, cache=None: [])
+    monkeypatch.setattr("plugin.core.discovery.discover_with_spotify", lambda query, max_results=5, settings=None, cache=None: [])
+    monkeypatch.setattr("plugin.core.discovery.discover_with_musicbrainz", musicbrainz)
+
+    out = discover_song("song", settings={"spotify": {"enabled": False}})
+    assert [item.split(":")[0] for item in out.provider_trace] == ["ytdlp", "youtube_api", "jamendo", "spotify", "musicbrainz"]
@@ -5,8 +5,7 @@ from plugin.core.lyric_analysis import analyze_lyrics
 from plugin.core.models import LyricsArtifact
 
 
-def test_analyze_lyrics_returns_structured_result(tmp_path) -> None:
-    cache = CacheStore(root_dir=str(tmp_path / "cache"), sqlite_path=str(tmp_path / "cache" / "index.sqlite"))
+def test_analyze_lyrics_returns_structured_result(cache: CacheStore) -> None:
     lyrics = LyricsArtifact(
         source="lrclib",
         text="I feel lost and broken tonight\nBut I still hope the morning light will heal me",
@@ -19,8 +18,7 @@ def test_analyze_lyrics_returns_structured_result(tmp_path) -> None:
     assert 0.0 <= out.confidence <= 1.0
 
 
-def test_analyze_lyrics_uses_cache(tmp_path) -> None:
-    cache = CacheStore(root_dir=str(tmp_path / "cache"), sqlite_path=str(tmp_path / "cache" / "index.sqlite"))
+def test_analyze_lyrics_uses_cache(cache: CacheStore) -> None:
     lyrics = LyricsArtifact(source="lrclib", text="Love and fear keep me awake in the dark")
 
     first = analyze_lyrics(lyrics, cache=cache)
@@ -33,3 +31,10 @@ def test_analyze_lyrics_uses_cache(tmp_path) -> None:
 def test_analyze_lyrics_returns_none_without_text() -> None:
     out = analyze_lyrics(LyricsArtifact(source="none", text=None))
     assert out is None
+
+
+def test_extract_themes_matches_keyword_substrings_in_theme_order() -> None:
+    from plugin.core.lyric_analysis import _extract_themes
+
+    assert _extract_themes("We fly over the open road, my darling, and I hold on") == ["love", "hope", "freedom"]
+    assert _extract_themes("wounded and heartless") == ["love", "pain"]
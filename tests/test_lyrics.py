@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from plugin.core.cache import CacheStore
-from plugin.core.lyrics import fetch_lyrics
+from plugin.core.lyrics import fetch_lyrics, fetch_lyrics_many
 from plugin.core.models import AudioArtifact, SourceCandidate
 
 
@@ -25,8 +25,7 @@ def _source() -> SourceCandidate:
     )
 
 
-def test_fetch_lyrics_lrclib_hit(monkeypatch, tmp_path) -> None:
-    cache = CacheStore(root_dir=str(tmp_path / "cache"), sqlite_path=str(tmp_path / "cache" / "index.sqlite"))
+def test_fetch_lyrics_lrclib_hit(monkeypatch, cache: CacheStore) -> None:
 
     def fake_get(url, params, timeout):
         return _Resp(
@@ -42,32 +41,30 @@ def test_fetch_lyrics_lrclib_hit(monkeypatch, tmp_path) -> None:
             ],
         )
 
-    monkeypatch.setattr("plugin.core.lyrics.requests.get", fake_get)
+    monkeypatch.setattr("plugin.core.lyrics.SESSION.get", fake_get)
     out = fetch_lyrics(_source(), cache=cache, settings={"lyrics": {"min_text_chars": 5}})
     assert out.source == "lrclib"
     assert out.text is not None
     assert "hold on" in out.text.lower()
 
 
-def test_fetch_lyrics_miss_returns_none(monkeypatch, tmp_path) -> None:
-    cache = CacheStore(root_dir=str(tmp_path / "cache"), sqlite_path=str(tmp_path / "cache" / "index.sqlite"))
+def test_fetch_lyrics_miss_returns_none(monkeypatch, cache: CacheStore) -> None:
 
     def fake_get(url, params, timeout):
         return _Resp(200, [])
 
-    monkeypatch.setattr("plugin.core.lyrics.requests.get", fake_get)
+    monkeypatch.setattr("plugin.core.lyrics.SESSION.get", fake_get)
     out = fetch_lyrics(_source(), cache=cache, settings={"lyrics": {"allow_asr_fallback": False}})
     assert out.source == "none"
     assert "LYRICS_NOT_FOUND" in out.warnings
 
 
-def test_fetch_lyrics_asr_fallback_dependency_missing(monkeypatch, tmp_path) -> None:
-    cache = CacheStore(root_dir=str(tmp_path / "cache"), sqlite_path=str(tmp_path / "cache" / "index.sqlite"))
+def test_fetch_lyrics_asr_fallback_dependency_missing(monkeypatch, cache: CacheStore) -> None:
 
     def fake_get(url, params, timeout):
         return _Resp(200, [])
 
-    monkeypatch.setattr("plugin.core.lyrics.requests.get", fake_get)
+    monkeypatch.setattr("plugin.core.lyrics.SESSION.get", fake_get)
     out = fetch_lyrics(
         _source(),
         cache=cache,
@@ -76,3 +73,22 @@ def test_fetch_lyrics_asr_fallback_dependency_missing(monkeypatch, tmp_path) ->
     )
     assert out.source == "none"
     assert "LYRICS_ASR_UNAVAILABLE" in out.warnings
+
+
+def test_fetch_lyrics_many_serves_cached_and_fetches_misses(monkeypatch, cache: CacheStore) -> None:
+    calls: list[str] = []
+
+    def fake_get(url, params, timeout):
+        calls.append(params["track_name"])
+        return _Resp(200, [{"trackName": params["track_name"], "plainLyrics": f"lyrics for {params['track_name']}"}])
+
+    monkeypatch.setattr("plugin.core.lyrics.SESSION.get", fake_get)
+    settings = {"lyrics": {"min_text_chars": 5}}
+    first = _source()
+    second = SourceCandidate(provider="ytdlp", source_id="def", title="Self Care", artist_guess="Mac Miller")
+    fetch_lyrics(first, cache=cache, settings=settings)
+    calls.clear()
+
+    out = fetch_lyrics_many([first, second], cache=cache, settings=settings)
+    assert [item.text for item in out] == ["lyrics for Good News", "lyrics for Self Care"]
+    assert calls == ["Self Care"]
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+from typing import Any, Callable
+
 import pytest
 
+from plugin.core import orchestrator
 from plugin.core.cache import CacheStore
 from plugin.core.errors import AnalysisError, DiscoveryError, RetrievalError
 from plugin.core.models import (
@@ -14,40 +17,65 @@ from plugin.core.models import (
     SourceCandidate,
     SynthesisResult,
 )
-from plugin.core.orchestrator import listen
-
-
-def _cache(tmp_path):
-    return CacheStore(root_dir=str(tmp_path / "cache"), sqlite_path=str(tmp_path / "cache" / "index.sqlite"))
-
+from plugin.core.orchestrator import discover, listen, listen_batch
+
+
+# The orchestrator never mutates candidates or descriptors, so tests share these instances.
+_SELECTED = SourceCandidate(provider="ytdlp", source_id="a", title="Song", url="https://www.youtube.com/watch?v=a")
+_SPOTIFY = SourceCandidate(provider="spotify", source_type="metadata", source_id="sp1", title="Song", confidence=0.99)
+_YTDLP = SourceCandidate(
+    provider="ytdlp",
+    source_type="youtube",
+    source_id="yt1",
+    title="Song",
+    url="https://www.youtube.com/watch?v=yt1",
+    confidence=0.85,
+)
+_YOUTUBE_API = SourceCandidate(
+    provider="youtube_api",
+    source_type="youtube",
+    source_id="yt2",
+    title="Song",
+    url="https://www.youtube.com/watch?v=yt2",
+    confidence=0.95,
+)
+_JAMENDO = SourceCandidate(
+    provider="jamendo",
+    source_type="youtube",
+    source_id="j1",
+    title="Song",
+    url="https://cdn.jamendo.com/audio.mp3",
+    confidence=0.80,
+)
+_DESCRIPTOR = DescriptorArtifact(
+    tempo_bpm=90.0,
+    key="C",
+    mode="major",
+    energy_proxy=0.5,
+    texture_proxy={"spectral_centroid_mean": 1000.0, "spectral_complexity_mean": 0.3},
+    confidence=0.8,
+    coverage={"tempo_bpm": "direct", "key": "direct", "mode": "direct", "energy_proxy": "direct"},
+    sources_used=["acousticbrainz.low-level"],
+)
 
-def _selected() -> SourceCandidate:
-    return SourceCandidate(provider="ytdlp", source_id="a", title="Song", url="https://www.youtube.com/watch?v=a")
 
+def _discover_stub(*candidates: SourceCandidate, trace: tuple[str, ...] = ()) -> Callable[..., DiscoveryResult]:
+    result = DiscoveryResult(query="q", selected=candidates[0], candidates=list(candidates), provider_trace=list(trace))
+    return lambda query, cache: result
 
-def test_listen_success(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
-    selected = _selected()
 
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.discover",
-        lambda query, cache: DiscoveryResult(query=query, selected=selected, candidates=[selected], provider_trace=["ytdlp:1"]),
-    )
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.fetch_audio",
-        lambda source, cache: FetchResult(source=source, audio=AudioArtifact(path="/tmp/a.wav", format="wav"), cache_hit=False),
-    )
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.analyze_audio",
-        lambda audio_path, cache: FeatureResult(tempo_bpm=100.0, key="C", mode="major", energy_mean=0.1),
-    )
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.fetch_lyrics",
-        lambda source, cache, settings, audio: LyricsArtifact(source="none", warnings=["LYRICS_NOT_FOUND"]),
-    )
-    monkeypatch.setattr("plugin.core.orchestrator.analyze_lyrics", lambda lyrics, cache: None)
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.build_synthesis",
-        lambda source, features, lyrics_analysis=None: SynthesisResult(
+@pytest.fixture
+def default_stubs(monkeypatch: pytest.MonkeyPatch) -> dict[str, Any]:
+    stubs: dict[str, Any] = {
+        "discover": _discover_stub(_SELECTED, trace=("ytdlp:1",)),
+        "fetch_audio": lambda source, cache: FetchResult(
+            source=source, audio=AudioArtifact(path="/tmp/a.wav", format="wav"), cache_hit=False
+        ),
+        "analyze_audio": lambda audio_path, cache: FeatureResult(tempo_bpm=100.0, key="C", mode="major", energy_mean=0.1),
+        "fetch_lyrics": lambda source, cache, settings, audio: LyricsArtifact(source="none", warnings=["LYRICS_NOT_FOUND"]),
+        "analyze_lyrics": lambda lyrics, cache: None,
+        "build_descriptor_artifact": lambda source, metadata, settings, cache=None: None,
+        "build_synthesis": lambda source, features, lyrics_analysis=None: SynthesisResult(
             natural_observation="obs",
             lyric_observation=None,
             combined_observation="combined",
@@ -55,10 +83,22 @@ def test_listen_success(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
             uncertainty_notes=[],
             prompt_for_text_model="p",
         ),
-    )
-    monkeypatch.setattr("plugin.core.orchestrator.build_descriptor_artifact", lambda source, metadata, settings: None)
+        "build_descriptor_synthesis": lambda source, descriptor, lyrics_analysis=None: SynthesisResult(
+            natural_observation="desc-obs",
+            lyric_observation=None,
+            combined_observation="desc-combined",
+            highlights=["desc"],
+            uncertainty_notes=["descriptor"],
+            prompt_for_text_model="desc-prompt",
+        ),
+    }
+    for name, fn in stubs.items():
+        monkeypatch.setattr(orchestrator, name, fn)
+    return stubs
+
 
-    out = listen("q", _cache(tmp_path), deep_analysis=True)
+def test_listen_success(default_stubs: dict[str, Any], cache: CacheStore) -> None:
+    out = listen("q", cache, deep_analysis=True)
     assert not out.errors
     assert out.analysis_mode == "full_audio"
     assert out.source is not None
@@ -71,142 +111,72 @@ def test_listen_success(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
     assert out.synthesis is not None
 
 
-def test_listen_discovery_error(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
-    def boom(query, cache):
-        raise DiscoveryError("DISCOVERY_NOT_FOUND", "not found")
+def test_listen_fetches_lyrics_while_analyzing(monkeypatch: pytest.MonkeyPatch, default_stubs: dict[str, Any], cache: CacheStore) -> None:
+    import threading
 
-    monkeypatch.setattr("plugin.core.orchestrator.discover", boom)
-    out = listen("q", _cache(tmp_path))
-    assert out.errors[0]["code"] == "DISCOVERY_NOT_FOUND"
+    lyrics_started = threading.Event()
 
+    def _analyze(audio_path, cache):
+        assert lyrics_started.wait(timeout=5)
+        return FeatureResult(tempo_bpm=100.0, key="C", mode="major", energy_mean=0.1)
 
-def test_listen_retrieval_error(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
-    selected = _selected()
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.discover",
-        lambda query, cache: DiscoveryResult(query=query, selected=selected, candidates=[selected], provider_trace=[]),
-    )
+    def _lyrics(source, cache, settings, audio):
+        lyrics_started.set()
+        return LyricsArtifact(source="none", warnings=["LYRICS_NOT_FOUND"])
 
-    def boom(source, cache):
-        raise RetrievalError("RETRIEVAL_TIMEOUT", "timeout")
+    monkeypatch.setattr(orchestrator, "analyze_audio", _analyze)
+    monkeypatch.setattr(orchestrator, "fetch_lyrics", _lyrics)
 
-    monkeypatch.setattr("plugin.core.orchestrator.fetch_audio", boom)
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.fetch_lyrics",
-        lambda source, cache, settings, audio: LyricsArtifact(source="none", warnings=["LYRICS_NOT_FOUND"]),
-    )
-    monkeypatch.setattr("plugin.core.orchestrator.analyze_lyrics", lambda lyrics, cache: None)
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.build_descriptor_artifact",
-        lambda source, metadata, settings: DescriptorArtifact(
-            tempo_bpm=90.0,
-            key="C",
-            mode="major",
-            energy_proxy=0.5,
-            texture_proxy={"spectral_centroid_mean": 1000.0, "spectral_complexity_mean": 0.3},
-            confidence=0.8,
-            coverage={"tempo_bpm": "direct", "key": "direct", "mode": "direct", "energy_proxy": "direct"},
-            sources_used=["acousticbrainz.low-level"],
-        ),
-    )
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.build_descriptor_synthesis",
-        lambda source, descriptor, lyrics_analysis=None: SynthesisResult(
-            natural_observation="desc-obs",
-            lyric_observation=None,
-            combined_observation="desc-combined",
-            highlights=["desc"],
-            uncertainty_notes=["descriptor"],
-            prompt_for_text_model="desc-prompt",
-        ),
-    )
+    out = listen("q", cache, deep_analysis=False)
+    assert out.analysis_mode == "full_audio"
+    assert out.lyrics is not None
+    assert out.lyrics.warnings == ["LYRICS_NOT_FOUND"]
 
-    out = listen("q", _cache(tmp_path), mode="auto")
-    assert out.errors[0]["code"] == "RETRIEVAL_TIMEOUT"
-    assert out.analysis_mode == "descriptor_only"
-    assert out.synthesis is not None
 
+def test_listen_discovery_error(monkeypatch: pytest.MonkeyPatch, default_stubs: dict[str, Any], cache: CacheStore) -> None:
+    def boom(query, cache):
+        raise DiscoveryError("DISCOVERY_NOT_FOUND", "not found")
 
-def test_listen_analysis_error(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
-    selected = _selected()
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.discover",
-        lambda query, cache: DiscoveryResult(query=query, selected=selected, candidates=[selected], provider_trace=[]),
-    )
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.fetch_audio",
-        lambda source, cache: FetchResult(source=source, audio=AudioArtifact(path="/tmp/a.wav", format="wav"), cache_hit=False),
-    )
+    monkeypatch.setattr(orchestrator, "discover", boom)
+    out = listen("q", cache)
+    assert out.errors[0]["code"] == "DISCOVERY_NOT_FOUND"
 
-    def boom(audio_path, cache):
-        raise AnalysisError("ANALYSIS_AUDIO_LOAD_FAILED", "bad")
 
-    monkeypatch.setattr("plugin.core.orchestrator.analyze_audio", boom)
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.fetch_lyrics",
-        lambda source, cache, settings, audio: LyricsArtifact(source="none", warnings=["LYRICS_NOT_FOUND"]),
-    )
-    monkeypatch.setattr("plugin.core.orchestrator.analyze_lyrics", lambda lyrics, cache: None)
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.build_descriptor_artifact",
-        lambda source, metadata, settings: DescriptorArtifact(
-            tempo_bpm=90.0,
-            key="C",
-            mode="major",
-            energy_proxy=0.5,
-            texture_proxy={"spectral_centroid_mean": 1000.0, "spectral_complexity_mean": 0.3},
-            confidence=0.8,
-            coverage={"tempo_bpm": "direct", "key": "direct", "mode": "direct", "energy_proxy": "direct"},
-            sources_used=["acousticbrainz.low-level"],
-        ),
-    )
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.build_descriptor_synthesis",
-        lambda source, descriptor, lyrics_analysis=None: SynthesisResult(
-            natural_observation="desc-obs",
-            lyric_observation=None,
-            combined_observation="desc-combined",
-            highlights=["desc"],
-            uncertainty_notes=["descriptor"],
-            prompt_for_text_model="desc-prompt",
-        ),
-    )
+@pytest.mark.parametrize(
+    ("stage", "exc"),
+    [
+        ("fetch_audio", RetrievalError("RETRIEVAL_TIMEOUT", "timeout")),
+        ("analyze_audio", AnalysisError("ANALYSIS_AUDIO_LOAD_FAILED", "bad")),
+    ],
+)
+def test_listen_auto_falls_back_to_descriptor(monkeypatch: pytest.MonkeyPatch, default_stubs: dict[str, Any], cache: CacheStore, stage: str, exc: Exception) -> None:
+    def boom(*args, **kwargs):
+        raise exc
 
-    out = listen("q", _cache(tmp_path), mode="auto")
-    assert out.errors[0]["code"] == "ANALYSIS_AUDIO_LOAD_FAILED"
-    assert out.analysis_mode == "descriptor_only"
+    monkeypatch.setattr(orchestrator, stage, boom)
+    monkeypatch.setattr(orchestrator, "build_descriptor_artifact", lambda source, metadata, settings, cache=None: _DESCRIPTOR)
 
+    out = listen("q", cache, mode="auto")
+    assert out.errors[0]["code"] == exc.code
+    assert out.analysis_mode == "descriptor_only"
+    assert out.synthesis is not None
 
-def test_listen_full_audio_mode_remains_strict(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
-    selected = _selected()
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.discover",
-        lambda query, cache: DiscoveryResult(query=query, selected=selected, candidates=[selected], provider_trace=[]),
-    )
 
+def test_listen_full_audio_mode_remains_strict(monkeypatch: pytest.MonkeyPatch, default_stubs: dict[str, Any], cache: CacheStore) -> None:
     def boom(source, cache):
         raise RetrievalError("RETRIEVAL_TIMEOUT", "timeout")
 
-    monkeypatch.setattr("plugin.core.orchestrator.fetch_audio", boom)
-    out = listen("q", _cache(tmp_path), mode="full_audio")
+    monkeypatch.setattr(orchestrator, "fetch_audio", boom)
+    out = listen("q", cache, mode="full_audio")
     assert out.errors[0]["code"] == "RETRIEVAL_TIMEOUT"
     assert out.analysis_mode == "failed"
 
 
-def test_listen_descriptor_only_mode(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
-    selected = _selected()
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.discover",
-        lambda query, cache: DiscoveryResult(query=query, selected=selected, candidates=[selected], provider_trace=[]),
-    )
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.fetch_lyrics",
-        lambda source, cache, settings, audio: LyricsArtifact(source="none", warnings=["LYRICS_NOT_FOUND"]),
-    )
-    monkeypatch.setattr("plugin.core.orchestrator.analyze_lyrics", lambda lyrics, cache: None)
+def test_listen_descriptor_only_mode(monkeypatch: pytest.MonkeyPatch, default_stubs: dict[str, Any], cache: CacheStore) -> None:
     monkeypatch.setattr(
-        "plugin.core.orchestrator.build_descriptor_artifact",
-        lambda source, metadata, settings: DescriptorArtifact(
+        orchestrator,
+        "build_descriptor_artifact",
+        lambda source, metadata, settings, cache=None: DescriptorArtifact(
             tempo_bpm=102.0,
             key="F",
             mode="minor",
@@ -217,50 +187,14 @@ def test_listen_descriptor_only_mode(monkeypatch: pytest.MonkeyPatch, tmp_path)
             sources_used=["acousticbrainz.low-level", "acousticbrainz.high-level"],
         ),
     )
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.build_descriptor_synthesis",
-        lambda source, descriptor, lyrics_analysis=None: SynthesisResult(
-            natural_observation="desc",
-            lyric_observation=None,
-            combined_observation="desc-c",
-            highlights=["h"],
-            uncertainty_notes=[],
-            prompt_for_text_model="p",
-        ),
-    )
 
-    out = listen("q", _cache(tmp_path), mode="descriptor_only")
+    out = listen("q", cache, mode="descriptor_only")
     assert out.analysis_mode == "descriptor_only"
     assert out.descriptor is not None
 
 
-def test_listen_auto_prefers_ytdlp_for_audio(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
-    selected = SourceCandidate(provider="spotify", source_type="metadata", source_id="sp1", title="Song", confidence=0.99)
-    ytdlp_candidate = SourceCandidate(
-        provider="ytdlp",
-        source_type="youtube",
-        source_id="yt1",
-        title="Song",
-        url="https://www.youtube.com/watch?v=yt1",
-        confidence=0.85,
-    )
-    youtube_api_candidate = SourceCandidate(
-        provider="youtube_api",
-        source_type="youtube",
-        source_id="yt2",
-        title="Song",
-        url="https://www.youtube.com/watch?v=yt2",
-        confidence=0.95,
-    )
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.discover",
-        lambda query, cache: DiscoveryResult(
-            query=query,
-            selected=selected,
-            candidates=[selected, youtube_api_candidate, ytdlp_candidate],
-            provider_trace=["ytdlp:1", "youtube_api:1", "spotify:1"],
-        ),
-    )
+def test_listen_auto_prefers_ytdlp_for_audio(monkeypatch: pytest.MonkeyPatch, default_stubs: dict[str, Any], cache: CacheStore) -> None:
+    monkeypatch.setattr(orchestrator, "discover", _discover_stub(_SPOTIFY, _YOUTUBE_API, _YTDLP, trace=("ytdlp:1", "youtube_api:1", "spotify:1")))
 
     called: list[str] = []
 
@@ -268,52 +202,17 @@ def test_listen_auto_prefers_ytdlp_for_audio(monkeypatch: pytest.MonkeyPatch, tm
         called.append(source.provider)
         return FetchResult(source=source, audio=AudioArtifact(path="/tmp/a.wav", format="wav"), cache_hit=False)
 
-    monkeypatch.setattr("plugin.core.orchestrator.fetch_audio", fake_fetch_audio)
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.analyze_audio",
-        lambda audio_path, cache: FeatureResult(tempo_bpm=100.0, key="C", mode="major", energy_mean=0.1),
-    )
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.fetch_lyrics",
-        lambda source, cache, settings, audio: LyricsArtifact(source="none", warnings=["LYRICS_NOT_FOUND"]),
-    )
-    monkeypatch.setattr("plugin.core.orchestrator.analyze_lyrics", lambda lyrics, cache: None)
-    monkeypatch.setattr("plugin.core.orchestrator.build_descriptor_artifact", lambda source, metadata, settings: None)
+    monkeypatch.setattr(orchestrator, "fetch_audio", fake_fetch_audio)
 
-    out = listen("q", _cache(tmp_path), mode="auto")
+    out = listen("q", cache, mode="auto")
     assert called == ["ytdlp"]
     assert out.analysis_mode == "full_audio"
     assert out.source is not None
     assert out.source.provider == "ytdlp"
 
 
-def test_listen_auto_retries_next_retrievable_candidate(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
-    selected = SourceCandidate(provider="spotify", source_type="metadata", source_id="sp1", title="Song", confidence=0.99)
-    ytdlp_candidate = SourceCandidate(
-        provider="ytdlp",
-        source_type="youtube",
-        source_id="yt1",
-        title="Song",
-        url="https://www.youtube.com/watch?v=yt1",
-        confidence=0.85,
-    )
-    youtube_api_candidate = SourceCandidate(
-        provider="youtube_api",
-        source_type="youtube",
-        source_id="yt2",
-        title="Song",
-        url="https://www.youtube.com/watch?v=yt2",
-        confidence=0.95,
-    )
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.discover",
-        lambda query, cache: DiscoveryResult(
-            query=query,
-            selected=selected,
-            candidates=[selected, ytdlp_candidate, youtube_api_candidate],
-            provider_trace=["ytdlp:error:query_failed", "youtube_api:1", "spotify:1"],
-        ),
-    )
+def test_listen_auto_retries_next_retrievable_candidate(monkeypatch: pytest.MonkeyPatch, default_stubs: dict[str, Any], cache: CacheStore) -> None:
+    monkeypatch.setattr(orchestrator, "discover", _discover_stub(_SPOTIFY, _YTDLP, _YOUTUBE_API, trace=("ytdlp:error:query_failed", "youtube_api:1", "spotify:1")))
 
     calls: list[str] = []
 
@@ -323,19 +222,9 @@ def test_listen_auto_retries_next_retrievable_candidate(monkeypatch: pytest.Monk
             raise RetrievalError("RETRIEVAL_YTDLP_FAILED", "bad")
         return FetchResult(source=source, audio=AudioArtifact(path="/tmp/b.wav", format="wav"), cache_hit=False)
 
-    monkeypatch.setattr("plugin.core.orchestrator.fetch_audio", fake_fetch_audio)
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.analyze_audio",
-        lambda audio_path, cache: FeatureResult(tempo_bpm=100.0, key="C", mode="major", energy_mean=0.1),
-    )
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.fetch_lyrics",
-        lambda source, cache, settings, audio: LyricsArtifact(source="none", warnings=["LYRICS_NOT_FOUND"]),
-    )
-    monkeypatch.setattr("plugin.core.orchestrator.analyze_lyrics", lambda lyrics, cache: None)
-    monkeypatch.setattr("plugin.core.orchestrator.build_descriptor_artifact", lambda source, metadata, settings: None)
+    monkeypatch.setattr(orchestrator, "fetch_audio", fake_fetch_audio)
 
-    out = listen("q", _cache(tmp_path), mode="auto")
+    out = listen("q", cache, mode="auto")
     assert calls == ["ytdlp", "youtube_api"]
     assert out.analysis_mode == "full_audio"
     assert out.source is not None
@@ -344,75 +233,31 @@ def test_listen_auto_retries_next_retrievable_candidate(monkeypatch: pytest.Monk
     assert any(item.startswith("audio_source:retry(") for item in out.fallback_trace)
 
 
-def test_listen_auto_no_retrievable_candidates(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
-    selected = SourceCandidate(provider="spotify", source_type="metadata", source_id="sp1", title="Song", confidence=0.99)
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.discover",
-        lambda query, cache: DiscoveryResult(
-            query=query,
-            selected=selected,
-            candidates=[selected],
-            provider_trace=["ytdlp:error:missing_binary", "spotify:1", "musicbrainz:1"],
-        ),
-    )
+def test_listen_auto_no_retrievable_candidates(monkeypatch: pytest.MonkeyPatch, default_stubs: dict[str, Any], cache: CacheStore) -> None:
+    monkeypatch.setattr(orchestrator, "discover", _discover_stub(_SPOTIFY, trace=("ytdlp:error:missing_binary", "spotify:1", "musicbrainz:1")))
 
     def fail_if_called(source, cache):
         raise AssertionError("fetch_audio should not be called when no retrievable candidate exists")
 
-    monkeypatch.setattr("plugin.core.orchestrator.fetch_audio", fail_if_called)
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.fetch_lyrics",
-        lambda source, cache, settings, audio: LyricsArtifact(source="none", warnings=["LYRICS_NOT_FOUND"]),
-    )
-    monkeypatch.setattr("plugin.core.orchestrator.analyze_lyrics", lambda lyrics, cache: None)
-    monkeypatch.setattr("plugin.core.orchestrator.build_descriptor_artifact", lambda source, metadata, settings: None)
+    monkeypatch.setattr(orchestrator, "fetch_audio", fail_if_called)
 
-    out = listen("q", _cache(tmp_path), mode="auto")
+    out = listen("q", cache, mode="auto")
     assert out.analysis_mode == "metadata_only"
     assert any(item == "mode:auto->metadata_only(no_retrievable_source)" for item in out.fallback_trace)
     assert any(item.startswith("primary:ytdlp_failed(") for item in out.fallback_trace)
 
 
-def test_listen_full_audio_no_retrievable_candidates(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
-    selected = SourceCandidate(provider="spotify", source_type="metadata", source_id="sp1", title="Song", confidence=0.99)
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.discover",
-        lambda query, cache: DiscoveryResult(query=query, selected=selected, candidates=[selected], provider_trace=["spotify:1"]),
-    )
+def test_listen_full_audio_no_retrievable_candidates(monkeypatch: pytest.MonkeyPatch, default_stubs: dict[str, Any], cache: CacheStore) -> None:
+    monkeypatch.setattr(orchestrator, "discover", _discover_stub(_SPOTIFY, trace=("spotify:1",)))
 
-    out = listen("q", _cache(tmp_path), mode="full_audio")
+    out = listen("q", cache, mode="full_audio")
     assert out.analysis_mode == "failed"
     assert out.errors
     assert out.errors[0]["code"] == "RETRIEVAL_UNAVAILABLE"
 
 
-def test_listen_auto_retries_to_jamendo_after_youtube_failures(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
-    selected = SourceCandidate(provider="spotify", source_type="metadata", source_id="sp1", title="Song", confidence=0.99)
-    youtube_candidate = SourceCandidate(
-        provider="youtube_api",
-        source_type="youtube",
-        source_id="yt2",
-        title="Song",
-        url="https://www.youtube.com/watch?v=yt2",
-        confidence=0.95,
-    )
-    jamendo_candidate = SourceCandidate(
-        provider="jamendo",
-        source_type="youtube",
-        source_id="j1",
-        title="Song",
-        url="https://cdn.jamendo.com/audio.mp3",
-        confidence=0.80,
-    )
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.discover",
-        lambda query, cache: DiscoveryResult(
-            query=query,
-            selected=selected,
-            candidates=[selected, youtube_candidate, jamendo_candidate],
-            provider_trace=["youtube_api:1", "jamendo:1", "spotify:1"],
-        ),
-    )
+def test_listen_auto_retries_to_jamendo_after_youtube_failures(monkeypatch: pytest.MonkeyPatch, default_stubs: dict[str, Any], cache: CacheStore) -> None:
+    monkeypatch.setattr(orchestrator, "discover", _discover_stub(_SPOTIFY, _YOUTUBE_API, _JAMENDO, trace=("youtube_api:1", "jamendo:1", "spotify:1")))
 
     calls: list[str] = []
 
@@ -422,20 +267,106 @@ def test_listen_auto_retries_to_jamendo_after_youtube_failures(monkeypatch: pyte
             raise RetrievalError("RETRIEVAL_YTDLP_FAILED", "bot check")
         return FetchResult(source=source, audio=AudioArtifact(path="/tmp/j.mp3", format="mp3"), cache_hit=False)
 
-    monkeypatch.setattr("plugin.core.orchestrator.fetch_audio", fake_fetch_audio)
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.analyze_audio",
-        lambda audio_path, cache: FeatureResult(tempo_bpm=100.0, key="C", mode="major", energy_mean=0.1),
-    )
-    monkeypatch.setattr(
-        "plugin.core.orchestrator.fetch_lyrics",
-        lambda source, cache, settings, audio: LyricsArtifact(source="none", warnings=["LYRICS_NOT_FOUND"]),
-    )
-    monkeypatch.setattr("plugin.core.orchestrator.analyze_lyrics", lambda lyrics, cache: None)
-    monkeypatch.setattr("plugin.core.orchestrator.build_descriptor_artifact", lambda source, metadata, settings: None)
+    monkeypatch.setattr(orchestrator, "fetch_audio", fake_fetch_audio)
 
-    out = listen("q", _cache(tmp_path), mode="auto")
+    out = listen("q", cache, mode="auto")
     assert calls == ["youtube_api", "jamendo"]
     assert out.analysis_mode == "full_audio"
     assert out.source is not None
     assert out.source.provider == "jamendo"
+
+
+def test_listen_batch_preserves_query_order(monkeypatch: pytest.MonkeyPatch, cache: CacheStore) -> None:
+    import threading
+
+    from plugin.core.models import ListenResult
+
+    barrier = threading.Barrier(3, timeout=5)
+
+    def _fake_listen(query, cache, deep_analysis=True, mode=None):
+        barrier.wait()
+        return ListenResult(query=query, analysis_mode="metadata_only")
+
+    monkeypatch.setattr(orchestrator, "listen", _fake_listen)
+    out = listen_batch(["a", "b", "c"], cache, max_workers=3)
+    assert [r.query for r in out] == ["a", "b", "c"]
+    assert listen_batch([], cache) == []
+
+
+def test_discover_reuses_parsed_cache_hit(monkeypatch: pytest.MonkeyPatch, cache: CacheStore) -> None:
+    calls = {"count": 0}
+
+    def _fake_discover_song(query, settings=None, cache=None):
+        calls["count"] += 1
+        return DiscoveryResult(query=query, selected=_SELECTED, candidates=[_SELECTED], provider_trace=["ytdlp:1"])
+
+    monkeypatch.setattr(orchestrator, "discover_song", _fake_discover_song)
+    first = discover("Song", cache)
+    second = discover("Song", cache)
+    third = discover("Song", cache)
+
+    assert calls["count"] == 1
+    assert second.model_dump() == first.model_dump()
+    assert third == second
+    assert third is not second
+
+    second.candidates.clear()
+    second.selected.title = "Mutated"
+    fourth = discover("Song", cache)
+    assert fourth.model_dump() == first.model_dump()
+
+
+def test_metadata_from_spotify_source_maps_raw_fields() -> None:
+    from plugin.core.orchestrator import _metadata_from_source
+
+    source = SourceCandidate(
+        provider="spotify",
+        source_type="metadata",
+        source_id="sp1",
+        title="Song",
+        raw={
+            "artists": [{"name": "Artist"}, {"id": "no-name"}],
+            "album": {"name": "Album", "release_date": "2020-01-01"},
+            "external_ids": {"isrc": "US1234567890"},
+            "popularity": 42,
+        },
+    )
+    meta = _metadata_from_source(source)
+    assert meta.source == "spotify"
+    assert meta.artists == ["Artist"]
+    assert (meta.album, meta.release_date, meta.isrc, meta.popularity) == ("Album", "2020-01-01", "US1234567890", 42)
+
+    unknown = _metadata_from_source(SourceCandidate(provider="jamendo", source_id="j1", title="Song", artist_guess="A"))
+    assert unknown.source == "unknown"
+    assert unknown.artists == []
+
+
+def test_discover_caches_not_found_briefly(monkeypatch: pytest.MonkeyPatch, cache: CacheStore) -> None:
+    calls = {"count": 0}
+
+    def _fail(query, settings=None, cache=None):
+        calls["count"] += 1
+        raise DiscoveryError("DISCOVERY_NOT_FOUND", "nothing")
+
+    monkeypatch.setattr(orchestrator, "discover_song", _fail)
+    for _ in range(2):
+        with pytest.raises(DiscoveryError) as exc:
+            discover("Missing Song", cache)
+        assert exc.value.code == "DISCOVERY_NOT_FOUND"
+    assert calls["count"] == 1
+
+    with pytest.raises(DiscoveryError):
+        discover("Missing Song", cache, negative_ttl_sec=-1)
+    assert calls["count"] == 2
+
+
+def test_cache_status_ignores_cached_not_found(monkeypatch: pytest.MonkeyPatch, cache: CacheStore) -> None:
+    def _fail(query, settings=None, cache=None):
+        raise DiscoveryError("DISCOVERY_NOT_FOUND", "nothing")
+
+    monkeypatch.setattr(orchestrator, "discover_song", _fail)
+    with pytest.raises(DiscoveryError):
+        discover("Missing Song", cache)
+
+    assert cache.cache_status("Missing Song")["query_cached"] is False
+    assert cache.get_query("Missing Song", ttl_sec=60) is None
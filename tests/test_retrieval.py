@@ -1,14 +1,33 @@
 from __future__ import annotations
 
 from pathlib import Path
-from subprocess import CompletedProcess
+from types import SimpleNamespace
+from typing import Callable
 
 import pytest
 
 from plugin.core.cache import CacheStore
 from plugin.core.errors import RetrievalError
 from plugin.core.models import SourceCandidate
-from plugin.core.retrieval import fetch_audio
+from plugin.core.retrieval import _ext_from_url, fetch_audio, fetch_audio_batch
+
+
+class _Resp:
+    def __init__(self, *chunks: bytes, status_code: int = 200, headers: dict | None = None) -> None:
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.chunks = chunks
+
+    @classmethod
+    def ranged(cls, payload: bytes, first: int, last: int, status_code: int = 206) -> _Resp:
+        headers = {"Content-Range": f"bytes {first}-{last}/{len(payload)}"}
+        return cls(payload[first : last + 1], status_code=status_code, headers=headers)
+
+    def raise_for_status(self) -> None:
+        return None
+
+    def iter_content(self, chunk_size: int = 65536):
+        yield from self.chunks
 
 
 def _source() -> SourceCandidate:
@@ -20,8 +39,52 @@ def _source() -> SourceCandidate:
     )
 
 
-def test_fetch_audio_cache_hit(tmp_path: Path) -> None:
-    cache = CacheStore(root_dir=str(tmp_path / "cache"), sqlite_path=str(tmp_path / "cache" / "index.sqlite"))
+def _fake_yt_dlp(produced_ext: str) -> SimpleNamespace:
+    class _FakeYDL:
+        def __init__(self, opts: dict) -> None:
+            self.opts = opts
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info) -> None:
+            return None
+
+        def download(self, urls: list[str]) -> int:
+            # CacheStore already created audio_dir; fetch_audio only checks the file exists.
+            Path(self.opts["outtmpl"].replace("%(ext)s", produced_ext)).touch()
+            return 0
+
+    return SimpleNamespace(YoutubeDL=_FakeYDL)
+
+
+class _DownloadError(Exception):
+    pass
+
+
+class _DownloadCancelled(Exception):
+    pass
+
+
+def _failing_yt_dlp(exc: Exception) -> SimpleNamespace:
+    class _FakeYDL:
+        def __init__(self, opts: dict) -> None:
+            self.opts = opts
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info) -> None:
+            return None
+
+        def download(self, urls: list[str]) -> int:
+            raise exc
+
+    utils = SimpleNamespace(DownloadError=_DownloadError, DownloadCancelled=_DownloadCancelled)
+    return SimpleNamespace(YoutubeDL=_FakeYDL, utils=utils)
+
+
+def test_fetch_audio_cache_hit(tmp_path: Path, cache: CacheStore) -> None:
     source = _source()
     source_key = cache.normalize_key(f"{source.provider}:{source.source_id}")
 
@@ -35,26 +98,64 @@ def test_fetch_audio_cache_hit(tmp_path: Path) -> None:
     assert out.audio.path == str(audio_path)
 
 
-def test_fetch_audio_download_miss(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
-    cache = CacheStore(root_dir=str(tmp_path / "cache"), sqlite_path=str(tmp_path / "cache" / "index.sqlite"))
+def test_fetch_audio_download_miss(monkeypatch: pytest.MonkeyPatch, cache: CacheStore) -> None:
     source = _source()
     source_key = cache.normalize_key(f"{source.provider}:{source.source_id}")
 
-    def fake_run(*args, **kwargs):
-        produced = tmp_path / "cache" / "audio" / f"{source_key}.wav"
-        produced.parent.mkdir(parents=True, exist_ok=True)
-        produced.write_bytes(b"audio")
-        return CompletedProcess(args=args, returncode=0, stdout="", stderr="")
-
-    monkeypatch.setattr("plugin.core.retrieval.subprocess.run", fake_run)
+    monkeypatch.setattr("plugin.core.retrieval._load_yt_dlp", lambda: _fake_yt_dlp("wav"))
 
     out = fetch_audio(source, cache)
     assert out.cache_hit is False
     assert out.audio.format == "wav"
+    assert out.audio.path.endswith(f"{source_key}.wav")
 
 
-def test_fetch_audio_metadata_only_source_fails(tmp_path: Path) -> None:
-    cache = CacheStore(root_dir=str(tmp_path / "cache"), sqlite_path=str(tmp_path / "cache" / "index.sqlite"))
+def test_fetch_audio_falls_back_to_produced_extension(monkeypatch: pytest.MonkeyPatch, cache: CacheStore) -> None:
+    monkeypatch.setattr("plugin.core.retrieval._load_yt_dlp", lambda: _fake_yt_dlp("opus"))
+
+    out = fetch_audio(_source(), cache)
+    assert out.audio.format == "opus"
+
+
+def test_fetch_audio_reports_missing_yt_dlp(monkeypatch: pytest.MonkeyPatch, cache: CacheStore) -> None:
+    monkeypatch.setattr("plugin.core.retrieval._load_yt_dlp", lambda: None)
+
+    with pytest.raises(RetrievalError) as exc:
+        fetch_audio(_source(), cache)
+    assert exc.value.code == "RETRIEVAL_YTDLP_MISSING"
+
+
+@pytest.mark.parametrize(
+    ("exc", "code"),
+    [
+        (_DownloadCancelled("retrieval deadline exceeded"), "RETRIEVAL_TIMEOUT"),
+        (_DownloadError("ERROR: unavailable"), "RETRIEVAL_YTDLP_FAILED"),
+    ],
+)
+def test_fetch_audio_maps_yt_dlp_errors(
+    monkeypatch: pytest.MonkeyPatch, cache: CacheStore, exc: Exception, code: str
+) -> None:
+    monkeypatch.setattr("plugin.core.retrieval._load_yt_dlp", lambda: _failing_yt_dlp(exc))
+
+    with pytest.raises(RetrievalError) as exc_info:
+        fetch_audio(_source(), cache, output_format="wav")
+    assert exc_info.value.code == code
+
+
+def test_fetch_audio_checks_deadline_in_postprocessor_hooks(
+    monkeypatch: pytest.MonkeyPatch, cache: CacheStore
+) -> None:
+    fake = _fake_yt_dlp("wav")
+    seen: list[dict] = []
+    real_ydl = fake.YoutubeDL
+    fake.YoutubeDL = lambda opts: seen.append(opts) or real_ydl(opts)
+    monkeypatch.setattr("plugin.core.retrieval._load_yt_dlp", lambda: fake)
+
+    fetch_audio(_source(), cache, output_format="wav")
+    assert seen[0]["postprocessor_hooks"] == seen[0]["progress_hooks"]
+
+
+def test_fetch_audio_metadata_only_source_fails(cache: CacheStore) -> None:
     source = SourceCandidate(provider="musicbrainz", source_type="metadata", source_id="mbid", title="T")
 
     with pytest.raises(RetrievalError) as exc:
@@ -62,8 +163,7 @@ def test_fetch_audio_metadata_only_source_fails(tmp_path: Path) -> None:
     assert exc.value.code == "RETRIEVAL_UNAVAILABLE"
 
 
-def test_fetch_audio_jamendo_download_success(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
-    cache = CacheStore(root_dir=str(tmp_path / "cache"), sqlite_path=str(tmp_path / "cache" / "index.sqlite"))
+def test_fetch_audio_jamendo_download_success(monkeypatch: pytest.MonkeyPatch, cache: CacheStore) -> None:
     source = SourceCandidate(
         provider="jamendo",
         source_type="youtube",
@@ -72,16 +172,7 @@ def test_fetch_audio_jamendo_download_success(monkeypatch: pytest.MonkeyPatch, t
         url="https://cdn.jamendo.com/audio.mp3",
     )
 
-    class _Resp:
-        def raise_for_status(self) -> None:
-            return None
-
-        @staticmethod
-        def iter_content(chunk_size: int = 65536):
-            yield b"abc"
-            yield b"def"
-
-    monkeypatch.setattr("plugin.core.retrieval.requests.get", lambda *args, **kwargs: _Resp())
+    monkeypatch.setattr("plugin.core.retrieval.SESSION.get", lambda *args, **kwargs: _Resp(b"abc", b"def"))
 
     out = fetch_audio(source, cache)
     assert out.cache_hit is False
@@ -89,10 +180,11 @@ def test_fetch_audio_jamendo_download_success(monkeypatch: pytest.MonkeyPatch, t
     assert Path(out.audio.path).exists()
 
 
-def test_fetch_audio_jamendo_http_error(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+def test_fetch_audio_jamendo_http_error(
+    monkeypatch: pytest.MonkeyPatch, cache: CacheStore, raiser: Callable[[Exception], Callable[..., None]]
+) -> None:
     import requests
 
-    cache = CacheStore(root_dir=str(tmp_path / "cache"), sqlite_path=str(tmp_path / "cache" / "index.sqlite"))
     source = SourceCandidate(
         provider="jamendo",
         source_type="youtube",
@@ -101,20 +193,18 @@ def test_fetch_audio_jamendo_http_error(monkeypatch: pytest.MonkeyPatch, tmp_pat
         url="https://cdn.jamendo.com/audio.mp3",
     )
 
-    monkeypatch.setattr(
-        "plugin.core.retrieval.requests.get",
-        lambda *args, **kwargs: (_ for _ in ()).throw(requests.HTTPError("bad")),
-    )
+    monkeypatch.setattr("plugin.core.retrieval.SESSION.get", raiser(requests.HTTPError("bad")))
 
     with pytest.raises(RetrievalError) as exc:
         fetch_audio(source, cache)
     assert exc.value.code == "RETRIEVAL_JAMENDO_HTTP_FAILED"
 
 
-def test_fetch_audio_jamendo_timeout(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+def test_fetch_audio_jamendo_timeout(
+    monkeypatch: pytest.MonkeyPatch, cache: CacheStore, raiser: Callable[[Exception], Callable[..., None]]
+) -> None:
     import requests
 
-    cache = CacheStore(root_dir=str(tmp_path / "cache"), sqlite_path=str(tmp_path / "cache" / "index.sqlite"))
     source = SourceCandidate(
         provider="jamendo",
         source_type="youtube",
@@ -123,11 +213,139 @@ def test_fetch_audio_jamendo_timeout(monkeypatch: pytest.MonkeyPatch, tmp_path:
         url="https://cdn.jamendo.com/audio.mp3",
     )
 
-    monkeypatch.setattr(
-        "plugin.core.retrieval.requests.get",
-        lambda *args, **kwargs: (_ for _ in ()).throw(requests.Timeout("timeout")),
-    )
+    monkeypatch.setattr("plugin.core.retrieval.SESSION.get", raiser(requests.Timeout("timeout")))
 
     with pytest.raises(RetrievalError) as exc:
         fetch_audio(source, cache)
     assert exc.value.code == "RETRIEVAL_JAMENDO_TIMEOUT"
+
+
+def test_fetch_audio_batch_preserves_order(monkeypatch: pytest.MonkeyPatch, cache: CacheStore) -> None:
+    sources = [
+        SourceCandidate(
+            provider="jamendo",
+            source_type="youtube",
+            source_id=f"j{idx}",
+            title="Track",
+            url=f"https://cdn.jamendo.com/audio{idx}.mp3",
+        )
+        for idx in range(3)
+    ]
+
+    monkeypatch.setattr("plugin.core.retrieval.SESSION.get", lambda *args, **kwargs: _Resp(b"abc"))
+
+    out = fetch_audio_batch(sources, cache, max_workers=2)
+    assert [item.source.source_id for item in out] == ["j0", "j1", "j2"]
+    assert fetch_audio_batch([], cache) == []
+
+
+def test_fetch_audio_batch_returns_failures_per_item(monkeypatch: pytest.MonkeyPatch, cache: CacheStore) -> None:
+    import requests
+
+    sources = [
+        SourceCandidate(
+            provider="jamendo",
+            source_type="youtube",
+            source_id=f"j{idx}",
+            title="Track",
+            url=f"https://cdn.jamendo.com/audio{idx}.mp3",
+        )
+        for idx in range(3)
+    ]
+
+    def _get(url: str, *args, **kwargs) -> _Resp:
+        if url.endswith("audio1.mp3"):
+            raise requests.ConnectionError("dead link")
+        return _Resp(b"abc")
+
+    monkeypatch.setattr("plugin.core.retrieval.SESSION.get", _get)
+
+    first, failed, last = fetch_audio_batch(sources, cache, max_workers=3)
+    assert isinstance(failed, RetrievalError)
+    assert failed.code == "RETRIEVAL_JAMENDO_HTTP_FAILED"
+    assert (first.source.source_id, last.source.source_id) == ("j0", "j2")
+    assert Path(last.audio.path).read_bytes() == b"abc"
+
+
+def test_fetch_audio_jamendo_ranged_download(monkeypatch: pytest.MonkeyPatch, cache: CacheStore) -> None:
+    source = SourceCandidate(
+        provider="jamendo",
+        source_type="youtube",
+        source_id="j1",
+        title="Track",
+        url="https://cdn.jamendo.com/audio.mp3",
+    )
+    payload = bytes(range(23))
+
+    def _get(url: str, headers: dict, **kwargs) -> _Resp:
+        first, last = headers["Range"].removeprefix("bytes=").split("-")
+        return _Resp.ranged(payload, int(first), int(last))
+
+    monkeypatch.setattr("plugin.core.retrieval._RANGE_PROBE_BYTES", 5)
+    monkeypatch.setattr("plugin.core.retrieval.SESSION.get", _get)
+
+    out = fetch_audio(source, cache)
+    assert Path(out.audio.path).read_bytes() == payload
+
+
+@pytest.mark.parametrize("failure", ["ignored_range", "connection_error"])
+def test_fetch_audio_jamendo_removes_partial_file_on_range_failure(
+    monkeypatch: pytest.MonkeyPatch, cache: CacheStore, failure: str
+) -> None:
+    import requests
+
+    source = SourceCandidate(
+        provider="jamendo",
+        source_type="youtube",
+        source_id="j1",
+        title="Track",
+        url="https://cdn.jamendo.com/audio.mp3",
+    )
+    payload = bytes(range(23))
+
+    def _get(url: str, headers: dict, **kwargs) -> _Resp:
+        first, last = (int(part) for part in headers["Range"].removeprefix("bytes=").split("-"))
+        if first == 0:
+            return _Resp.ranged(payload, first, last)
+        if failure == "connection_error":
+            raise requests.ConnectionError("reset")
+        return _Resp.ranged(payload, first, last, status_code=200)
+
+    monkeypatch.setattr("plugin.core.retrieval._RANGE_PROBE_BYTES", 5)
+    monkeypatch.setattr("plugin.core.retrieval.SESSION.get", _get)
+
+    with pytest.raises(RetrievalError) as exc:
+        fetch_audio(source, cache)
+    assert exc.value.code == "RETRIEVAL_JAMENDO_HTTP_FAILED"
+    assert list(Path(cache.audio_dir).iterdir()) == []
+
+
+def test_fetch_audio_jamendo_trims_preallocated_tail(monkeypatch: pytest.MonkeyPatch, cache: CacheStore) -> None:
+    source = SourceCandidate(
+        provider="jamendo",
+        source_type="youtube",
+        source_id="j1",
+        title="Track",
+        url="https://cdn.jamendo.com/audio.mp3",
+    )
+
+    monkeypatch.setattr("plugin.core.retrieval.SESSION.get", lambda *args, **kwargs: _Resp(b"abcdef", headers={"Content-Length": "100"}))
+
+    out = fetch_audio(source, cache)
+    assert Path(out.audio.path).read_bytes() == b"abcdef"
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("https://cdn.jamendo.com/audio.mp3", "mp3"),
+        ("https://prod-1.storage.jamendo.com/?trackid=123&format=mp31", "mp3"),
+        ("https://x.example/a/track.OGG?name=a.wav#f.flac", "ogg"),
+        ("https://x.example/a.b/track", "mp3"),
+        ("https://x.example/.hidden", "mp3"),
+        ("https://x.example:8080/dir/", "mp3"),
+        ("https://x.example/a.mp3;type=a", "mp3"),
+    ],
+)
+def test_ext_from_url(url: str, expected: str) -> None:
+    assert _ext_from_url(url) == expected
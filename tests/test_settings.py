@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import os
+
+from plugin.core.settings import load_settings
+
+
+def test_load_settings_reuses_parse_until_file_changes(tmp_path) -> None:
+    path = tmp_path / "settings.yaml"
+    path.write_text("listen:\n  default_mode: auto\n")
+
+    first = load_settings(str(path))
+    assert first == {"listen": {"default_mode": "auto"}}
+    assert load_settings(str(path)) is first
+
+    path.write_text("listen:\n  default_mode: metadata_only\n")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert load_settings(str(path)) == {"listen": {"default_mode": "metadata_only"}}
+
+
+def test_load_settings_missing_file(tmp_path) -> None:
+    assert load_settings(str(tmp_path / "missing.yaml")) == {}
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import pytest
 
-from plugin.core.spotify_client import SpotifyClientError, get_app_token, search_tracks
+from plugin.core import spotify_client
+from plugin.core.cache import CacheStore
+from plugin.core.spotify_client import SpotifyClientError, get_app_token, search_tracks, search_tracks_batch
 
 
 class _Resp:
@@ -15,48 +17,228 @@ class _Resp:
         return self._payload
 
 
+@pytest.fixture(autouse=True)
+def _spotify_app(monkeypatch: pytest.MonkeyPatch) -> None:
+    spotify_client._TOKEN_CACHE.clear()
+    monkeypatch.setenv("SPOTIFY_CLIENT_ID", "id")
+    monkeypatch.setenv("SPOTIFY_CLIENT_SECRET", "secret")
+    monkeypatch.setattr(
+        "plugin.core.spotify_client.SESSION.post",
+        lambda *args, **kwargs: _Resp(200, {"access_token": "abc"}),
+    )
+
+
 def test_get_app_token_missing_credentials(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.delenv("SPOTIFY_CLIENT_ID", raising=False)
     monkeypatch.delenv("SPOTIFY_CLIENT_SECRET", raising=False)
     assert get_app_token({"spotify": {}}) is None
 
 
-def test_get_app_token_success(monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setenv("SPOTIFY_CLIENT_ID", "id")
-    monkeypatch.setenv("SPOTIFY_CLIENT_SECRET", "secret")
+def test_get_app_token_success() -> None:
+    assert get_app_token({"spotify": {}}) == "abc"
+
+
+def test_get_app_token_reuses_cached_token(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    def _post(*args, **kwargs) -> _Resp:
+        calls.append(1)
+        return _Resp(200, {"access_token": f"tok{len(calls)}", "expires_in": 3600})
+
+    monkeypatch.setattr("plugin.core.spotify_client.SESSION.post", _post)
+    assert get_app_token({"spotify": {}}) == "tok1"
+    assert get_app_token({"spotify": {}}) == "tok1"
+    assert len(calls) == 1
+
+    spotify_client._TOKEN_CACHE["id"] = ("tok1", 0.0)
+    assert get_app_token({"spotify": {}}) == "tok2"
+
+
+def test_get_app_token_persists_token_in_cache(monkeypatch: pytest.MonkeyPatch, cache: CacheStore) -> None:
     monkeypatch.setattr(
-        "plugin.core.spotify_client.requests.post",
-        lambda *args, **kwargs: _Resp(200, {"access_token": "abc"}),
+        "plugin.core.spotify_client.SESSION.post",
+        lambda *args, **kwargs: _Resp(200, {"access_token": "abc", "expires_in": 3600}),
     )
-    assert get_app_token({"spotify": {}}) == "abc"
+    assert get_app_token({"spotify": {}}, cache=cache) == "abc"
+
+    spotify_client._TOKEN_CACHE.clear()
+    monkeypatch.setattr("plugin.core.spotify_client.SESSION.post", lambda *args, **kwargs: _Resp(500))
+    assert get_app_token({"spotify": {}}, cache=cache) == "abc"
 
 
 def test_search_tracks_rate_limit(monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setenv("SPOTIFY_CLIENT_ID", "id")
-    monkeypatch.setenv("SPOTIFY_CLIENT_SECRET", "secret")
     monkeypatch.setattr(
-        "plugin.core.spotify_client.requests.post",
-        lambda *args, **kwargs: _Resp(200, {"access_token": "abc"}),
+        "plugin.core.spotify_client.SESSION.get",
+        lambda *args, **kwargs: _Resp(429, headers={"Retry-After": "5"}),
     )
+    sleeps: list[float] = []
+    monkeypatch.setattr("plugin.core.spotify_client.time.sleep", sleeps.append)
+    with pytest.raises(SpotifyClientError) as exc:
+        search_tracks("track", {"spotify": {}}, limit=5)
+    assert exc.value.code == "SPOTIFY_RATE_LIMIT"
+    assert [int(delay) for delay in sleeps] == [5]
+    assert all(delay - int(delay) <= spotify_client._RATE_LIMIT_JITTER_SEC for delay in sleeps)
+
+
+def test_search_tracks_rate_limit_wait_budget_from_settings(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr(
-        "plugin.core.spotify_client.requests.get",
+        "plugin.core.spotify_client.SESSION.get",
         lambda *args, **kwargs: _Resp(429, headers={"Retry-After": "5"}),
     )
+    sleeps: list[float] = []
+    monkeypatch.setattr("plugin.core.spotify_client.time.sleep", sleeps.append)
+    with pytest.raises(SpotifyClientError) as exc:
+        search_tracks("track", {"spotify": {"rate_limit_max_wait_sec": 16}}, limit=5)
+    assert exc.value.code == "SPOTIFY_RATE_LIMIT"
+    assert [int(delay) for delay in sleeps] == [5, 5, 5]
+    assert sum(sleeps) <= 16
+
+
+def test_search_tracks_recovers_after_rate_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    responses = iter([_Resp(429), _Resp(429, headers={"Retry-After": "5"}), _Resp(200, {"tracks": {"items": [{"id": "t1"}]}})])
+    monkeypatch.setattr("plugin.core.spotify_client.SESSION.get", lambda *args, **kwargs: next(responses))
+    sleeps: list[float] = []
+    monkeypatch.setattr("plugin.core.spotify_client.time.sleep", sleeps.append)
+
+    out = search_tracks("track", {"spotify": {}}, limit=5)
+    assert out[0]["id"] == "t1"
+    assert [int(delay) for delay in sleeps] == [1, 5]
+
+
+def test_search_tracks_fails_fast_on_long_retry_after(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[int] = []
+
+    def _get(*args, **kwargs) -> _Resp:
+        calls.append(1)
+        return _Resp(429, headers={"Retry-After": "3600"})
+
+    monkeypatch.setattr("plugin.core.spotify_client.SESSION.get", _get)
+    sleeps: list[float] = []
+    monkeypatch.setattr("plugin.core.spotify_client.time.sleep", sleeps.append)
     with pytest.raises(SpotifyClientError) as exc:
         search_tracks("track", {"spotify": {}}, limit=5)
     assert exc.value.code == "SPOTIFY_RATE_LIMIT"
+    assert sleeps == []
+    assert len(calls) == 1
 
 
 def test_search_tracks_parses_items(monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setenv("SPOTIFY_CLIENT_ID", "id")
-    monkeypatch.setenv("SPOTIFY_CLIENT_SECRET", "secret")
-    monkeypatch.setattr(
-        "plugin.core.spotify_client.requests.post",
-        lambda *args, **kwargs: _Resp(200, {"access_token": "abc"}),
-    )
     monkeypatch.setattr(
-        "plugin.core.spotify_client.requests.get",
+        "plugin.core.spotify_client.SESSION.get",
         lambda *args, **kwargs: _Resp(200, {"tracks": {"items": [{"id": "t1", "name": "Song"}]}}),
     )
     out = search_tracks("song", {"spotify": {}}, limit=5)
     assert out and out[0]["id"] == "t1"
+
+
+def test_search_tracks_keeps_only_used_track_fields(monkeypatch: pytest.MonkeyPatch) -> None:
+    item = {
+        "id": "t1",
+        "name": "Song",
+        "duration_ms": 200000,
+        "artists": [{"id": "a1", "name": "Artist", "href": "https://api.spotify.com/v1/artists/a1"}],
+        "album": {"name": "Album", "release_date": "2020-01-01", "images": [{"url": "x"}], "available_markets": ["US"]},
+        "external_ids": {"isrc": "US1234567890"},
+        "popularity": 42,
+        "available_markets": ["US", "CA"],
+        "preview_url": "https://p.scdn.co/x",
+    }
+    monkeypatch.setattr(
+        "plugin.core.spotify_client.SESSION.get",
+        lambda *args, **kwargs: _Resp(200, {"tracks": {"items": [item]}}),
+    )
+    out = search_tracks("song", {"spotify": {}}, limit=5)
+    assert out == [
+        {
+            "id": "t1",
+            "name": "Song",
+            "duration_ms": 200000,
+            "external_ids": {"isrc": "US1234567890"},
+            "popularity": 42,
+            "artists": [{"name": "Artist"}],
+            "album": {"name": "Album", "release_date": "2020-01-01"},
+        }
+    ]
+
+
+def test_search_tracks_refreshes_rejected_token(monkeypatch: pytest.MonkeyPatch) -> None:
+    tokens = iter(["stale", "fresh"])
+    monkeypatch.setattr(
+        "plugin.core.spotify_client.SESSION.post",
+        lambda *args, **kwargs: _Resp(200, {"access_token": next(tokens), "expires_in": 3600}),
+    )
+    assert get_app_token({"spotify": {}}) == "stale"
+
+    seen: list[str] = []
+
+    def _get(*args, **kwargs) -> _Resp:
+        seen.append(kwargs["headers"]["Authorization"])
+        if kwargs["headers"]["Authorization"] == "Bearer stale":
+            return _Resp(401)
+        return _Resp(200, {"tracks": {"items": [{"id": "t1"}]}})
+
+    monkeypatch.setattr("plugin.core.spotify_client.SESSION.get", _get)
+    assert search_tracks("song", {"spotify": {}})[0]["id"] == "t1"
+    assert seen == ["Bearer stale", "Bearer fresh"]
+    assert spotify_client._TOKEN_CACHE["id"][0] == "fresh"
+
+
+def test_search_tracks_drops_rejected_token_from_cache(monkeypatch: pytest.MonkeyPatch, cache: CacheStore) -> None:
+    cache.put_kv("spotify:token:id", "stale", 2**31)
+    monkeypatch.setattr(
+        "plugin.core.spotify_client.SESSION.post",
+        lambda *args, **kwargs: _Resp(200, {"access_token": "fresh", "expires_in": 3600}),
+    )
+    monkeypatch.setattr(
+        "plugin.core.spotify_client.SESSION.get",
+        lambda *args, **kwargs: _Resp(401)
+        if kwargs["headers"]["Authorization"] == "Bearer stale"
+        else _Resp(200, {"tracks": {"items": [{"id": "t1"}]}}),
+    )
+
+    assert search_tracks("song", {"spotify": {}}, cache=cache)[0]["id"] == "t1"
+    assert cache.get_kv("spotify:token:id")[0] == "fresh"
+
+    spotify_client._TOKEN_CACHE.clear()
+    assert get_app_token({"spotify": {}}, cache=cache) == "fresh"
+
+
+def test_search_tracks_batch_shares_token(monkeypatch: pytest.MonkeyPatch) -> None:
+    posts = []
+
+    def _post(*args, **kwargs) -> _Resp:
+        posts.append(1)
+        return _Resp(200, {"access_token": "abc"})
+
+    monkeypatch.setattr("plugin.core.spotify_client.SESSION.post", _post)
+    monkeypatch.setattr(
+        "plugin.core.spotify_client.SESSION.get",
+        lambda *args, **kwargs: _Resp(200, {"tracks": {"items": [{"id": kwargs["params"]["q"]}]}}),
+    )
+    out = search_tracks_batch(["a", "b", "c"], {"spotify": {}}, max_workers=3)
+    assert [items[0]["id"] for items in out] == ["a", "b", "c"]
+    assert len(posts) == 1
+
+
+def test_search_tracks_uses_cache_and_revalidates_with_etag(monkeypatch: pytest.MonkeyPatch, cache: CacheStore) -> None:
+    seen_headers: list[dict] = []
+    responses = iter(
+        [
+            _Resp(200, {"tracks": {"items": [{"id": "t1"}]}}, headers={"ETag": '"v1"'}),
+            _Resp(304),
+        ]
+    )
+
+    def _get(*args, **kwargs) -> _Resp:
+        seen_headers.append(kwargs["headers"])
+        return next(responses)
+
+    monkeypatch.setattr("plugin.core.spotify_client.SESSION.get", _get)
+
+    assert search_tracks("song", {"spotify": {}}, cache=cache)[0]["id"] == "t1"
+    assert search_tracks("song", {"spotify": {}}, cache=cache)[0]["id"] == "t1"
+    assert len(seen_headers) == 1
+
+    monkeypatch.setattr("plugin.core.spotify_client._SEARCH_TTL_SEC", -1)
+    assert search_tracks("song", {"spotify": {}}, cache=cache)[0]["id"] == "t1"
+    assert seen_headers[-1]["If-None-Match"] == '"v1"'
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-import json
+import sys
 from typing import Any
 
+import orjson
+
 from plugin.core import CacheStore
 from plugin.core.settings import cache_config, load_settings
 
@@ -15,6 +17,9 @@ def get_cache() -> CacheStore:
 
 def print_json(data: Any) -> None:
     if hasattr(data, "model_dump"):
-        print(json.dumps(data.model_dump(), indent=2))
-        return
-    print(json.dumps(data, indent=2))
+        data = data.model_dump()
+    # Write the encoded bytes straight through instead of decoding to str for print();
+    # flush first so anything already print()ed keeps its place.
+    sys.stdout.flush()
+    sys.stdout.buffer.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE))
+    sys.stdout.flush()
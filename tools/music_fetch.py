@@ -4,23 +4,64 @@ from __future__ import annotations
 import argparse
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+if TYPE_CHECKING:
+    from plugin.core.cache import CacheStore
+
+
+def _fetch_one(query: str, cache: CacheStore, output_format: str) -> dict[str, Any]:
+    from plugin.core.discovery import discover_song
+    from plugin.core.errors import MusicListenError
+    from plugin.core.retrieval import fetch_audio
+
+    try:
+        discovery = discover_song(query, cache=cache)
+        if not discovery.selected:
+            return {
+                "query": query,
+                "error": {"code": "DISCOVERY_EMPTY_SELECTION", "message": "No selected source from discovery"},
+            }
+        result = fetch_audio(discovery.selected, cache=cache, output_format=output_format)
+    except MusicListenError as exc:
+        return {"query": query, "error": {"code": exc.code, "message": exc.message}}
+    return {"query": query, **result.model_dump()}
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Fetch audio artifact for discovered query")
-    parser.add_argument("query", help="Song query")
+    parser.add_argument("query", nargs="?", help="Song query")
     parser.add_argument("--format", default="wav", help="Audio format for yt-dlp extraction")
+    parser.add_argument("--queries-file", help="Fetch every non-empty line of this file; emits one JSON object per line")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent fetches for --queries-file")
     args = parser.parse_args()
+    if not args.query and not args.queries_file:
+        parser.error("a query or --queries-file is required")
 
-    from plugin.core.discovery import discover_song
-    from plugin.core.retrieval import fetch_audio
     from tools._common import get_cache, print_json
 
     cache = get_cache()
-    discovery = discover_song(args.query)
+    if args.queries_file:
+        from concurrent.futures import ThreadPoolExecutor
+
+        import orjson
+
+        queries = [line.strip() for line in Path(args.queries_file).read_text().splitlines() if line.strip()]
+        # Discovery and downloads wait on the network and on ffmpeg subprocesses, so threads overlap them.
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            for row in pool.map(lambda q: _fetch_one(q, cache, args.format), queries):
+                sys.stdout.buffer.write(orjson.dumps(row) + b"\n")
+                sys.stdout.flush()
+        return
+
+    from plugin.core.discovery import discover_song
+    from plugin.core.retrieval import fetch_audio
+
+    discovery = discover_song(args.query, cache=cache)
     if not discovery.selected:
         print_json({"error": "No selected source from discovery"})
         return